@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Markov chain analysis for Markov Learning Lab designs, on sparse (CSR) matrices
+- Python counterpart of lib/markov-analysis.ts: transition matrix, stationary distribution
+  by power iteration, communicating classes, periodicity and absorbing states, plus
+  vectorized random-walk simulation
+- Matrices are CSR arrays, so cost grows with the number of transitions rather than
+  the square of the number of states
+- Communicating classes use an iterative Tarjan pass; the period of each class is the gcd
+  of BFS level differences along its edges, which is exact rather than bounded by path length
+- Requires NumPy
+"""
+
+from math import gcd
+
+import numpy as np
+
+
+class CSRMatrix:
+    """Sparse transition matrix: row i holds columns indices[indptr[i]:indptr[i + 1]]"""
+
+    __slots__ = ('n', 'indptr', 'indices', 'data')
+
+    def __init__(self, n, indptr, indices, data):
+        self.n = n
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+
+    @classmethod
+    def from_edges(cls, n, rows, cols, probs):
+        """Build from parallel edge arrays; duplicate (row, col) pairs are summed like buildTransitionMatrix"""
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        probs = np.asarray(probs, dtype=np.float64)
+        order = np.lexsort((cols, rows))
+        rows, cols, probs = rows[order], cols[order], probs[order]
+        if len(rows):
+            first = np.ones(len(rows), dtype=bool)
+            first[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+            starts = np.flatnonzero(first)
+            probs = np.add.reduceat(probs, starts)
+            rows, cols = rows[starts], cols[starts]
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return cls(n, indptr, cols, probs)
+
+    def row_ids(self):
+        """Row index of every stored entry"""
+        return np.repeat(np.arange(self.n), np.diff(self.indptr))
+
+    def row_sums(self):
+        return np.bincount(self.row_ids(), weights=self.data, minlength=self.n)
+
+    def left_multiply(self, vector):
+        """vector · P"""
+        return np.bincount(self.indices, weights=vector[self.row_ids()] * self.data, minlength=self.n)
+
+    def positive(self):
+        """Same structure restricted to entries with probability > 0 (the transition graph)"""
+        keep = self.data > 0
+        rows = self.row_ids()[keep]
+        indptr = np.zeros(self.n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=self.n), out=indptr[1:])
+        return CSRMatrix(self.n, indptr, self.indices[keep], self.data[keep])
+
+
+def build_transition_matrix(states, transitions):
+    """CSR matrix over `states` in list order; transitions to unknown states are ignored"""
+    index = {state['id']: i for i, state in enumerate(states)}
+    rows, cols, probs = [], [], []
+    for t in transitions:
+        i, j = index.get(t.get('from')), index.get(t.get('to'))
+        if i is not None and j is not None:
+            rows.append(i)
+            cols.append(j)
+            probs.append(float(t.get('probability') or 0))
+    return CSRMatrix.from_edges(len(states), rows, cols, probs)
+
+
+def stationary_distribution(matrix, tolerance=1e-6, max_iterations=1000):
+    """Power iteration from the uniform distribution, as computeStationaryDistribution does"""
+    n = matrix.n
+    if n == 0:
+        return np.zeros(0), False, 0
+    distribution = np.full(n, 1 / n)
+    converged = False
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        following = matrix.left_multiply(distribution)
+        if np.max(np.abs(distribution - following)) < tolerance:
+            converged = True
+            break
+        distribution = following
+    total = distribution.sum()
+    if total > 0:
+        distribution = distribution / total
+    return distribution, converged, iterations
+
+
+def communicating_classes(graph):
+    """Strongly connected components of the positive-probability graph (iterative Tarjan)"""
+    n = graph.n
+    indptr, indices = graph.indptr.tolist(), graph.indices.tolist()
+    order = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    comp = [-1] * n
+    stack = []
+    classes = []
+    counter = 0
+    for root in range(n):
+        if order[root] != -1:
+            continue
+        work = [(root, indptr[root])]
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        while work:
+            node, edge = work[-1]
+            if edge < indptr[node + 1]:
+                work[-1] = (node, edge + 1)
+                child = indices[edge]
+                if order[child] == -1:
+                    order[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack[child] = True
+                    work.append((child, indptr[child]))
+                elif on_stack[child] and order[child] < low[node]:
+                    low[node] = order[child]
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[node] < low[parent]:
+                    low[parent] = low[node]
+            if low[node] == order[node]:
+                members = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    comp[member] = len(classes)
+                    members.append(member)
+                    if member == node:
+                        break
+                classes.append(sorted(members))
+    return classes, comp
+
+
+def class_periods(graph, classes, comp):
+    """Period of each class: gcd of level[u] + 1 - level[v] over its internal edges (0 if it has none)"""
+    indptr, indices = graph.indptr.tolist(), graph.indices.tolist()
+    level = [-1] * graph.n
+    periods = []
+    for k, members in enumerate(classes):
+        root = members[0]
+        level[root] = 0
+        frontier = [root]
+        period = 0
+        while frontier:
+            following = []
+            for u in frontier:
+                for e in range(indptr[u], indptr[u + 1]):
+                    v = indices[e]
+                    if comp[v] != k:
+                        continue
+                    if level[v] == -1:
+                        level[v] = level[u] + 1
+                        following.append(v)
+                    else:
+                        period = gcd(period, level[u] + 1 - level[v])
+            frontier = following
+        periods.append(period)
+    return periods
+
+
+def absorbing_states(matrix, tolerance=1e-6):
+    """States whose only outgoing probability is a self-loop of 1"""
+    rows = matrix.row_ids()
+    self_prob = np.zeros(matrix.n)
+    loops = rows == matrix.indices
+    self_prob[rows[loops]] = matrix.data[loops]
+    totals = matrix.row_sums()
+    return np.flatnonzero((np.abs(self_prob - 1) < tolerance) & (np.abs(totals - 1) < tolerance))
+
+
+def simulate(matrix, starts, steps, rng):
+    """
+    Advance independent walkers `steps` times; returns final states and visit counts.
+    Each step samples every walker's successor at once by bisecting the cumulative
+    row probabilities, so one step costs O(walkers · log transitions).
+    """
+    position = np.asarray(starts, dtype=np.int64)
+    visits = np.zeros(matrix.n, dtype=np.int64)
+    if len(matrix.data) == 0:
+        np.add.at(visits, position, steps)
+        return position, visits
+    cumulative = np.cumsum(matrix.data)
+    row_start = np.concatenate(([0.0], cumulative))[matrix.indptr[:-1]]
+    row_total = cumulative[np.maximum(matrix.indptr[1:] - 1, 0)] - row_start
+    for _ in range(steps):
+        # Walkers on rows without transitions stay put
+        stuck = matrix.indptr[position + 1] == matrix.indptr[position]
+        target = row_start[position] + rng.random(len(position)) * row_total[position]
+        edge = np.searchsorted(cumulative, target, side='right')
+        edge = np.clip(edge, matrix.indptr[position], matrix.indptr[position + 1] - 1)
+        position = np.where(stuck, position, matrix.indices[np.maximum(edge, 0)])
+        visits += np.bincount(position, minlength=matrix.n)
+    return position, visits
+
+
+def analyze(states, transitions, tolerance=1e-6, max_iterations=1000):
+    """ConvergenceAnalysis-shaped result for a design's states and transitions"""
+    matrix = build_transition_matrix(states, transitions)
+    distribution, converged, iterations = stationary_distribution(matrix, tolerance, max_iterations)
+    graph = matrix.positive()
+    classes, comp = communicating_classes(graph)
+    periods = class_periods(graph, classes, comp)
+    absorbing = absorbing_states(matrix)
+    ids = [state['id'] for state in states]
+    irreducible = len(classes) == 1 and matrix.n > 0
+    # A class without internal edges (a transient singleton) does not make the chain periodic
+    aperiodic = matrix.n > 0 and all(period in (0, 1) for period in periods)
+    return {
+        'stationaryDistribution': distribution.tolist(),
+        'converged': converged,
+        'iterations': iterations,
+        'chainProperties': {
+            'isErgodic': irreducible and aperiodic,
+            'isIrreducible': irreducible,
+            'isAperiodic': aperiodic,
+            'communicatingClasses': [[ids[i] for i in members] for members in classes],
+            'hasAbsorbingStates': len(absorbing) > 0,
+            'absorbingStates': [ids[i] for i in absorbing],
+        },
+    }
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Embedded-component manifest for Markov Learning Lab content
+- Scans lessons (data/lms.json) and examples (data/examples.json) for ```component blocks
+  and "Coming Soon" visualization placeholders
+- Parses blocks the way parseComponentConfig in components/markdown-renderer.tsx does
+- Validates component names against the renderer's componentRegistry and props against
+  the demo prop interfaces
+- Writes a per-lesson manifest of the demo chunks each page needs
+- With --baseline, fails if any block or placeholder from an earlier lms.json went missing
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LMS_PATH = REPO_ROOT / 'data' / 'lms.json'
+EXAMPLES_PATH = REPO_ROOT / 'data' / 'examples.json'
+RENDERER_PATH = REPO_ROOT / 'components' / 'markdown-renderer.tsx'
+MANIFEST_PATH = REPO_ROOT / 'data' / 'component-manifest.json'
+
+# Mirrors the *Props interfaces in components/demos/
+COMPONENT_SCHEMA = {
+    'FlipConvergence': {
+        'p': 'number',
+        'trials': 'number',
+        'updateIntervalMs': 'number',
+        'batch': 'number',
+        'maxPoints': 'number',
+        'height': 'number',
+        'autoStart': 'boolean',
+    },
+    'FlipCard': {
+        'intervalMs': 'number',
+        'size': 'number',
+    },
+    'BayesianCalculator': {
+        'initialPrior': 'number',
+        'initialLikelihood': 'number',
+        'initialEvidence': 'number',
+        'height': 'number',
+    },
+    'PMFPDFExplorer': {
+        'distribution': ('binomial', 'poisson', 'normal', 'exponential', 'uniform'),
+        'height': 'number',
+    },
+    'InteractiveVisualization': {
+        'initialStates': 'number',
+        'height': 'number',
+    },
+}
+
+FENCE_OPEN_RE = re.compile(r'^\s*(`{3,}|~{3,})\s*([^\s`]*)')
+# The blockquote enhance_content.fix_html_divs writes, and the <div> placeholder it rewrites
+PLACEHOLDER_RES = (
+    re.compile(r'^\s*>\s*\*\*(?:💡\s*)?(.*?Coming Soon!?)\*\*'),
+    re.compile(r'^\s*(?:<div[^>]*>\s*)?<strong>\s*(?:📊\s*)?([^<]*?Coming Soon!?)\s*</strong>'),
+)
+KEY_VALUE_RE = re.compile(r'^([A-Za-z0-9_-]+)\s*:\s*(.*)$')
+REGISTRY_RE = re.compile(r'const componentRegistry\b.*?=\s*\{(.*?)\n\}', re.DOTALL)
+REGISTRY_KEY_RE = re.compile(r'^\s*(\w+)\s*:', re.MULTILINE)
+
+
+def registry_names():
+    """Component names registered in components/markdown-renderer.tsx"""
+    match = REGISTRY_RE.search(RENDERER_PATH.read_text(encoding='utf-8'))
+    return set(REGISTRY_KEY_RE.findall(match.group(1))) if match else set()
+
+
+def parse_component_config(raw):
+    """Port of parseComponentConfig: JSON first, then `name:` / `props:` lines"""
+    text = raw.strip()
+    if not text:
+        return None
+    try:
+        obj = json.loads(text)
+    except ValueError:
+        fields = {}
+        for line in filter(None, (ln.strip() for ln in text.splitlines())):
+            match = KEY_VALUE_RE.match(line)
+            if match:
+                fields[match.group(1)] = match.group(2)
+        if not fields.get('name'):
+            return None
+        try:
+            props = json.loads(fields['props']) if fields.get('props') else {}
+        except ValueError:
+            props = {}
+        return {'name': fields['name'], 'props': props}
+    if isinstance(obj, dict) and isinstance(obj.get('name'), str):
+        props = obj.get('props')
+        return {'name': obj['name'], 'props': {} if props is None else props}
+    return None
+
+
+def scan_markdown(markdown):
+    """Return (component blocks, placeholders) with 1-based line numbers"""
+    components = []
+    placeholders = []
+    lines = markdown.split('\n')
+    i = 0
+    while i < len(lines):
+        fence = FENCE_OPEN_RE.match(lines[i])
+        if fence:
+            marker, lang = fence.group(1), fence.group(2)
+            start = i
+            body = []
+            i += 1
+            close = re.compile(rf'^\s*{re.escape(marker[0])}{{{len(marker)},}}\s*$')
+            while i < len(lines) and not close.match(lines[i]):
+                body.append(lines[i])
+                i += 1
+            if lang in ('component', 'Component'):
+                components.append({'line': start + 1, 'raw': '\n'.join(body)})
+            i += 1
+            continue
+        placeholder = next(filter(None, (regex.match(lines[i]) for regex in PLACEHOLDER_RES)), None)
+        if placeholder:
+            placeholders.append({'line': i + 1, 'title': placeholder.group(1).strip()})
+        i += 1
+    return components, placeholders
+
+
+def validate_props(name, props):
+    """Return a list of problems with a block's props"""
+    if not isinstance(props, dict):
+        return [f'props must be an object, got {type(props).__name__}']
+    schema = COMPONENT_SCHEMA.get(name)
+    if schema is None:
+        return []
+    problems = []
+    for key, value in props.items():
+        expected = schema.get(key)
+        if expected is None:
+            problems.append(f'unknown prop "{key}"')
+        elif expected == 'number' and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            problems.append(f'prop "{key}" should be a number, got {json.dumps(value)}')
+        elif expected == 'boolean' and not isinstance(value, bool):
+            problems.append(f'prop "{key}" should be a boolean, got {json.dumps(value)}')
+        elif isinstance(expected, tuple) and value not in expected:
+            problems.append(f'prop "{key}" should be one of {", ".join(expected)}, got {json.dumps(value)}')
+    return problems
+
+
+def iter_documents(lms, examples):
+    """Yield (key, markdown) for every lesson and every string field of every example"""
+    for lesson in lms['lessons']:
+        yield f"lesson:{lesson['id']}", lesson.get('content') or ''
+    for example in examples:
+        texts = []
+        stack = [example]
+        while stack:
+            value = stack.pop()
+            if isinstance(value, str):
+                texts.append(value)
+            elif isinstance(value, dict):
+                stack.extend(value.values())
+            elif isinstance(value, list):
+                stack.extend(value)
+        yield f"example:{example['id']}", '\n'.join(texts)
+
+
+def build_manifest(lms, examples, registry):
+    """Return (manifest, errors) for all content"""
+    manifest = {}
+    errors = []
+    for key, markdown in iter_documents(lms, examples):
+        blocks, placeholders = scan_markdown(markdown)
+        components = []
+        for block in blocks:
+            where = f"{key} line {block['line']}"
+            cfg = parse_component_config(block['raw'])
+            if cfg is None:
+                errors.append(f'{where}: unparseable component block')
+                continue
+            if cfg['name'] not in registry:
+                errors.append(f"{where}: unknown component \"{cfg['name']}\"")
+                continue
+            errors.extend(f'{where}: {cfg["name"]} {problem}' for problem in validate_props(cfg['name'], cfg['props']))
+            components.append({'name': cfg['name'], 'props': cfg['props'], 'line': block['line']})
+        if components or placeholders:
+            manifest[key] = {
+                'chunks': sorted({c['name'] for c in components}),
+                'components': components,
+                'placeholders': placeholders,
+            }
+    return manifest, errors
+
+
+def check_preserved(baseline, manifest):
+    """Blocks and placeholders in the baseline that no longer appear in the same lesson"""
+    missing = []
+    for key, before in baseline.items():
+        after = manifest.get(key, {'components': [], 'placeholders': []})
+        # Props may be retuned; each component instance has to survive by name
+        kept = [c['name'] for c in after['components']]
+        for c in before['components']:
+            if c['name'] in kept:
+                kept.remove(c['name'])
+            else:
+                missing.append(f"{key}: component {c['name']} (was line {c['line']}) is gone")
+        # Placeholders may be reworded; only their count has to survive, and a component
+        # that is new to the lesson counts as the demo that replaced one
+        removed = len(before['placeholders']) - len(after['placeholders']) - len(kept)
+        if removed > 0:
+            missing.append(f'{key}: {removed} "Coming Soon" placeholder(s) removed')
+    return missing
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the embedded-component manifest and validate component blocks')
+    parser.add_argument('--lms', default=str(LMS_PATH))
+    parser.add_argument('--examples', default=str(EXAMPLES_PATH))
+    parser.add_argument('-o', '--output', default=str(MANIFEST_PATH))
+    parser.add_argument('--baseline', help='earlier lms.json whose blocks must all survive (e.g. data/lms-backup.json)')
+    parser.add_argument('--check', action='store_true', help='validate only, do not write the manifest')
+    args = parser.parse_args()
+
+    registry = registry_names()
+    if not registry:
+        sys.exit(f'❌ Could not find componentRegistry in {RENDERER_PATH}')
+    drift = registry.symmetric_difference(COMPONENT_SCHEMA)
+    for name in sorted(drift):
+        where = 'componentRegistry' if name in registry else 'COMPONENT_SCHEMA'
+        print(f'⚠️  {name} is only in {where}; props are not validated for it', file=sys.stderr)
+
+    manifest, errors = build_manifest(load_json(args.lms), load_json(args.examples), registry)
+    if args.baseline:
+        baseline, _ = build_manifest(load_json(args.baseline), [], registry)
+        errors += check_preserved(baseline, manifest)
+
+    if not args.check:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'registry': sorted(registry), 'pages': manifest}, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+
+    for error in errors:
+        print(f'  ❌ {error}', file=sys.stderr)
+    blocks = sum(len(page['components']) for page in manifest.values())
+    placeholders = sum(len(page['placeholders']) for page in manifest.values())
+    print(f'{"❌" if errors else "✅"} {blocks} component blocks and {placeholders} placeholders '
+          f'across {len(manifest)} pages, {len(errors)} problems')
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
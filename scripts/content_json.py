@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Canonical JSON serialization for Markov Learning Lab content files
+- One byte-exact format for data/*.json, shared by every content script
+- Matches JSON.stringify(data, null, 2) as written by lib/server/lms-store.ts, so
+  Python and Node writes of the same data produce zero diff
+- Unicode is always written literally (never \\u-escaped); numbers use JavaScript formatting
+- Two profiles: 'pretty' (2-space indent, for review) and 'compact' (minified, for serving)
+- Round-trip verification: the output must parse back to the same data and re-serialize identically
+"""
+
+import argparse
+import json
+import math
+import os
+import stat
+import sys
+import tempfile
+from decimal import Decimal
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CONTENT_FILES = [
+    REPO_ROOT / 'data' / 'lms.json',
+    REPO_ROOT / 'data' / 'examples.json',
+    REPO_ROOT / 'data' / 'practice-questions.json',
+]
+
+PROFILES = ('pretty', 'compact')
+
+
+class RoundTripError(ValueError):
+    """Serialized output does not parse back to the original data"""
+
+
+def js_number(value):
+    """Format a number the way JavaScript's Number.prototype.toString does"""
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value) or math.isinf(value):
+        raise ValueError(f'{value} cannot be stored in content JSON')
+    if value == 0:
+        return '0'
+    sign = '-' if value < 0 else ''
+    # repr gives the shortest round-tripping digits, as JS does; value = 0.DIGITS × 10^n
+    _, digit_tuple, exponent = Decimal(repr(abs(value))).as_tuple()
+    n = exponent + len(digit_tuple)
+    digits = ''.join(map(str, digit_tuple)).rstrip('0')
+    k = len(digits)
+    if k <= n <= 21:
+        text = digits + '0' * (n - k)
+    elif 0 < n <= 21:
+        text = f'{digits[:n]}.{digits[n:]}'
+    elif -6 < n <= 0:
+        text = '0.' + '0' * -n + digits
+    else:
+        mantissa = digits[0] + (f'.{digits[1:]}' if k > 1 else '')
+        text = f"{mantissa}e{'+' if n - 1 > 0 else '-'}{abs(n - 1)}"
+    return sign + text
+
+
+def is_array_index(key):
+    return key.isdigit() and (key == '0' or key[0] != '0') and int(key) < 2 ** 32 - 1
+
+
+def ordered_items(obj):
+    """JS object key order: array-index keys ascending, then the rest in insertion order"""
+    index_keys = sorted((k for k in obj if is_array_index(k)), key=int)
+    if not index_keys:
+        return obj.items()
+    return [(k, obj[k]) for k in index_keys] + [(k, v) for k, v in obj.items() if not is_array_index(k)]
+
+
+def _encode(value, indent, depth, out):
+    if value is None:
+        out.append('null')
+    elif value is True:
+        out.append('true')
+    elif value is False:
+        out.append('false')
+    elif isinstance(value, (int, float)):
+        out.append(js_number(value))
+    elif isinstance(value, str):
+        out.append(json.dumps(value, ensure_ascii=False))
+    elif isinstance(value, (list, tuple)):
+        if not value:
+            out.append('[]')
+            return
+        inner = '\n' + ' ' * (indent * (depth + 1)) if indent else ''
+        out.append('[')
+        for i, item in enumerate(value):
+            out.append((',' if i else '') + inner)
+            _encode(item, indent, depth + 1, out)
+        out.append(('\n' + ' ' * (indent * depth) if indent else '') + ']')
+    elif isinstance(value, dict):
+        if not value:
+            out.append('{}')
+            return
+        inner = '\n' + ' ' * (indent * (depth + 1)) if indent else ''
+        colon = ': ' if indent else ':'
+        out.append('{')
+        for i, (key, item) in enumerate(ordered_items(value)):
+            out.append((',' if i else '') + inner + json.dumps(str(key), ensure_ascii=False) + colon)
+            _encode(item, indent, depth + 1, out)
+        out.append(('\n' + ' ' * (indent * depth) if indent else '') + '}')
+    else:
+        raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def dumps(data, profile='pretty'):
+    """Serialize `data` in the canonical form for `profile`"""
+    if profile not in PROFILES:
+        raise ValueError(f'unknown profile {profile!r}; expected one of {", ".join(PROFILES)}')
+    out = []
+    _encode(data, 2 if profile == 'pretty' else 0, 0, out)
+    return ''.join(out)
+
+
+def _same(a, b):
+    """Structural equality that also checks key order and keeps booleans apart from numbers"""
+    if isinstance(a, dict):
+        return (
+            isinstance(b, dict)
+            and [k for k, _ in ordered_items(a)] == list(b)
+            and all(_same(a[k], b[k]) for k in a)
+        )
+    if isinstance(a, (list, tuple)):
+        return isinstance(b, list) and len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    return a == b and isinstance(a, bool) == isinstance(b, bool)
+
+
+def verify_round_trip(data, text, profile='pretty'):
+    """Raise RoundTripError unless `text` parses back to `data` and re-serializes identically"""
+    parsed = json.loads(text)
+    if not _same(data, parsed):
+        raise RoundTripError('serialized output does not parse back to the same data')
+    if dumps(parsed, profile) != text:
+        raise RoundTripError('serialization is not idempotent')
+
+
+def current_umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+def write_json(path, data, profile='pretty'):
+    """
+    Write `data` canonically, verified and atomically. Returns False without
+    touching the file when it already holds exactly these bytes.
+    """
+    text = dumps(data, profile)
+    verify_round_trip(data, text, profile)
+    path = Path(path)
+    encoded = text.encode('utf-8')
+    if path.exists() and path.read_bytes() == encoded:
+        return False
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(encoded)
+        # mkstemp files are 0600; keep the original's mode, or what open() would have given
+        os.chmod(tmp, stat.S_IMODE(path.stat().st_mode) if path.exists() else 0o666 & ~current_umask())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Normalize content JSON files to the canonical format')
+    parser.add_argument('files', nargs='*', help='JSON files (default: lms, examples and practice questions)')
+    parser.add_argument('--check', action='store_true', help='report non-canonical files without rewriting them')
+    parser.add_argument('--minify-dir', help='also write <name>.min.json copies (compact profile) here')
+    args = parser.parse_args()
+
+    files = [Path(f) for f in args.files] or CONTENT_FILES
+    stale = []
+    for path in files:
+        raw = path.read_text(encoding='utf-8')
+        data = json.loads(raw)
+        if args.check:
+            if dumps(data) != raw:
+                stale.append(path)
+                print(f'  ❌ {path} is not canonical')
+            continue
+        if write_json(path, data):
+            print(f'  ✏️  {path} rewritten')
+        if args.minify_dir:
+            out = Path(args.minify_dir) / f'{path.stem}.min.json'
+            out.parent.mkdir(parents=True, exist_ok=True)
+            write_json(out, data, 'compact')
+            print(f'  📦 {out}: {len(raw.encode())} → {out.stat().st_size} bytes')
+
+    if stale:
+        print(f'❌ {len(stale)} files need `python scripts/content_json.py`')
+        sys.exit(1)
+    print(f'✅ {len(files)} files canonical')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the admin content API, for exercising scripts/upload_content.py
+- Serves GET /api/admin/content/export, POST /api/admin/content/import-single and
+  POST /api/admin/content/import with the same request and response shapes as the
+  app/api/admin/content routes, backed by an in-memory store
+- Optionally seeded from an lms.json; --cookie requires a matching Cookie header (401 otherwise)
+- --fail-rate answers a share of requests with 503 and --latency delays every response,
+  so retries, backoff and checkpoint resume can be tried without a deployment
+- Requires aiohttp
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+
+class ContentStore:
+    """Courses and lessons keyed by id, stored in the export's lms.json shape"""
+
+    def __init__(self, data=None):
+        self.courses = {}
+        self.lessons = {}
+        for course in (data or {}).get('courses', []):
+            self.put_course(course)
+        for lesson in (data or {}).get('lessons', []):
+            self.put_lesson(lesson, lesson.get('courseId'))
+
+    def put_course(self, course):
+        now = datetime.now(timezone.utc).isoformat()
+        self.courses[course['id']] = {
+            'id': course['id'],
+            'title': course.get('title'),
+            'description': course.get('description'),
+            'slug': course.get('slug') or course['id'],
+            'lessons': 0,
+            'status': course.get('status') or 'draft',
+            'createdAt': course.get('createdAt') or now,
+            'updatedAt': course.get('updatedAt') or now,
+        }
+
+    def put_lesson(self, lesson, course_id):
+        now = datetime.now(timezone.utc).isoformat()
+        self.lessons[lesson['id']] = {
+            'id': lesson['id'],
+            'courseId': course_id,
+            'title': lesson.get('title'),
+            'description': lesson.get('description'),
+            'content': lesson.get('content'),
+            'status': lesson.get('status') or 'draft',
+            'order': lesson.get('order') or 0,
+            'createdAt': lesson.get('createdAt') or now,
+            'updatedAt': lesson.get('updatedAt') or now,
+        }
+
+    def export(self):
+        return {
+            'courses': list(self.courses.values()),
+            'lessons': sorted(self.lessons.values(), key=lambda l: (l['courseId'] or '', l['order'])),
+        }
+
+
+def make_app(store, cookie=None, fail_rate=0.0, latency=0.0, seed=None):
+    """aiohttp application serving `store`; request counts are kept in app['stats']"""
+    rng = random.Random(seed)
+    stats = {'requests': 0, 'failed': 0}
+
+    @web.middleware
+    async def gate(request, handler):
+        stats['requests'] += 1
+        if latency:
+            await asyncio.sleep(latency)
+        if cookie is not None and request.headers.get('Cookie') != cookie:
+            return web.json_response({'success': False, 'error': 'Not authenticated'}, status=401)
+        if fail_rate and rng.random() < fail_rate:
+            stats['failed'] += 1
+            return web.json_response({'success': False, 'error': 'Injected failure'}, status=503)
+        return await handler(request)
+
+    async def export(request):
+        return web.json_response(store.export())
+
+    async def import_single(request):
+        form = await request.post()
+        upload = form.get('file')
+        kind = form.get('type')
+        if not isinstance(upload, web.FileField):
+            return web.json_response({'success': False, 'error': 'No file uploaded'}, status=400)
+        if not upload.filename.endswith('.json'):
+            return web.json_response({'success': False, 'error': 'Invalid file type. Please upload a JSON file.'}, status=400)
+        try:
+            data = json.loads(upload.file.read().decode('utf-8'))
+        except ValueError:
+            return web.json_response({'success': False, 'error': 'Invalid JSON format'}, status=400)
+
+        if kind == 'course':
+            if not data.get('id') or not data.get('title') or not data.get('description'):
+                return web.json_response({'success': False, 'error': 'Invalid course format. Missing required fields.'}, status=400)
+            store.put_course(data)
+        elif kind == 'lesson':
+            if not all(data.get(field) for field in ('id', 'title', 'description', 'content')):
+                return web.json_response({'success': False, 'error': 'Invalid lesson format. Missing required fields.'}, status=400)
+            course_id = form.get('courseId') or data.get('courseId')
+            if course_id not in store.courses:
+                return web.json_response({'success': False, 'error': f'Course {course_id} not found'}, status=404)
+            store.put_lesson(data, course_id)
+        else:
+            return web.json_response({'success': False, 'error': "Invalid type. Must be 'course', 'lesson', or 'lms'"}, status=400)
+        return web.json_response({'success': True, 'data': {'created': 0, 'updated': 1, 'errors': []}})
+
+    async def import_bulk(request):
+        body = await request.json()
+        courses, lessons = body.get('courses'), body.get('lessons')
+        if not isinstance(courses, list) or not isinstance(lessons, list):
+            return web.json_response({'success': False, 'error': 'Invalid data format'}, status=400)
+        options = body.get('options') or {}
+        results = {section: {'created': 0, 'updated': 0, 'skipped': 0, 'errors': []} for section in ('courses', 'lessons')}
+        # Save-as-new is not modelled; items are either overwritten or inserted when missing
+        for course in courses:
+            if options.get('overwriteCourses', {}).get(course['id']) is True:
+                store.put_course(course)
+                results['courses']['updated'] += 1
+            elif course['id'] in store.courses:
+                results['courses']['skipped'] += 1
+            else:
+                store.put_course(course)
+                results['courses']['created'] += 1
+        for lesson in lessons:
+            if lesson.get('courseId') not in store.courses:
+                results['lessons']['errors'].append(f"Lesson {lesson['id']}: course {lesson.get('courseId')} not found")
+            elif options.get('overwriteLessons', {}).get(lesson['id']) is True:
+                store.put_lesson(lesson, lesson['courseId'])
+                results['lessons']['updated'] += 1
+            elif lesson['id'] in store.lessons:
+                results['lessons']['skipped'] += 1
+            else:
+                store.put_lesson(lesson, lesson['courseId'])
+                results['lessons']['created'] += 1
+        return web.json_response({'success': True, 'data': results})
+
+    app = web.Application(middlewares=[gate], client_max_size=64 * 1024 ** 2)
+    app['store'] = store
+    app['stats'] = stats
+    app.router.add_get('/api/admin/content/export', export)
+    app.router.add_post('/api/admin/content/import-single', import_single)
+    app.router.add_post('/api/admin/content/import', import_bulk)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve an in-memory stand-in of the admin content API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--seed-data', help='lms.json to start from (default: empty)')
+    parser.add_argument('--cookie', help='require this exact Cookie header')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='share of requests answered with 503')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--dump', help='write the store as lms.json here on shutdown')
+    args = parser.parse_args()
+
+    data = None
+    if args.seed_data:
+        with open(args.seed_data, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    store = ContentStore(data)
+    app = make_app(store, cookie=args.cookie, fail_rate=args.fail_rate, latency=args.latency)
+
+    if args.dump:
+        async def dump(app):
+            with open(args.dump, 'w', encoding='utf-8') as f:
+                json.dump(store.export(), f, indent=2, ensure_ascii=False)
+                f.write('\n')
+            print(f"💾 {len(store.courses)} courses and {len(store.lessons)} lessons → {args.dump}")
+        app.on_shutdown.append(dump)
+
+    print(f'🧪 Stand-in content API on http://{args.host}:{args.port} '
+          f'({len(store.courses)} courses, {len(store.lessons)} lessons)')
+    web.run_app(app, host=args.host, port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
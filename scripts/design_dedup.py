@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Canonical hashing and deduplication of saved Markov chain designs
+- Canonicalizes a MarkovChain (lib/server/design-store.ts): layout fields (x, y, color) and
+  state/transition ids are dropped, states are ordered by name (repeated names by their edges,
+  via colour refinement), duplicate transitions are summed and probabilities quantized, so
+  copies that were only moved, recolored or re-keyed hash the same
+- Batch job over data/designs.json and user_designs dumps (JSONL/CSV, optionally .gz):
+  groups designs by canonical hash, flags copies of the stock examples in data/examples.json,
+  and analyzes each distinct chain once
+- Analyses are cached by hash across runs, so stock examples and repeat designs are never
+  re-analyzed; they refer to states by canonical position, and reports map positions to names
+- Requires NumPy (for the analysis)
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+from chain_analysis import analyze
+from progress_aggregate import iter_rows, jsonb
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+EXAMPLES_PATH = REPO_ROOT / 'data' / 'examples.json'
+DESIGNS_PATH = REPO_ROOT / 'data' / 'designs.json'
+
+DEFAULT_PRECISION = 6
+# Bump when canonical forms or cached analyses change shape, so stale cache entries are dropped
+CACHE_VERSION = 2
+
+
+def refine(colour, out_edges, in_edges):
+    """
+    Colour refinement: split colours by the multiset of (neighbour colour, q) on outgoing
+    and incoming edges until stable. Colours are ranks of id-free signatures, so the result
+    only depends on the chain's structure, and refined colours keep the order of their parents.
+    """
+    while True:
+        signatures = {
+            v: (colour[v],
+                tuple(sorted((colour[w], q) for w, q in out_edges[v])),
+                tuple(sorted((colour[w], q) for w, q in in_edges[v])))
+            for v in colour
+        }
+        rank = {sig: i for i, sig in enumerate(sorted(set(signatures.values())))}
+        refined = {v: rank[signatures[v]] for v in colour}
+        if len(rank) == len(set(colour.values())):
+            return refined
+        colour = refined
+
+
+def twin_swaps(colour, out_edges, in_edges):
+    """
+    Transpositions {u: v, v: u} that generate every swap of twin states: same colour and
+    the same edges once the two are exchanged. Each is an automorphism of the chain, and
+    twinship is transitive, so swaps of neighbours in each twin class are enough.
+    """
+    out_map = {v: dict(edges) for v, edges in out_edges.items()}
+    in_map = {v: dict(edges) for v, edges in in_edges.items()}
+
+    def twins(u, v):
+        pair = (u, v)
+        return (out_map[u].get(v, 0) == out_map[v].get(u, 0)
+                and {w: q for w, q in out_map[u].items() if w not in pair}
+                == {w: q for w, q in out_map[v].items() if w not in pair}
+                and {w: q for w, q in in_map[u].items() if w not in pair}
+                == {w: q for w, q in in_map[v].items() if w not in pair})
+
+    groups = {}
+    for v in colour:
+        key = (colour[v], out_map[v].get(v, 0), len(out_map[v]), len(in_map[v]))
+        groups.setdefault(key, []).append(v)
+    swaps = []
+    for members in groups.values():
+        classes = []
+        for v in members:
+            for twin_class in classes:
+                if twins(twin_class[0], v):
+                    swaps.append({twin_class[-1]: v, v: twin_class[-1]})
+                    twin_class.append(v)
+                    break
+            else:
+                classes.append([v])
+    return swaps
+
+
+def spread(reached, frontier, generators):
+    """Grow `reached` in place to its closure under the permutations in `generators`"""
+    while frontier:
+        v = frontier.pop()
+        for g in generators:
+            w = g.get(v, v)
+            if w not in reached:
+                reached.add(w)
+                frontier.append(w)
+
+
+def canonical_order(colour, out_edges, in_edges):
+    """
+    Individualize-and-refine: while a colour is shared, try each of its states first and keep
+    the order whose transition list is smallest. Equal lists from two branches give an
+    automorphism: the search jumps back to where the branches split, and branches in the
+    orbit of one already tried are skipped. Swaps of twin states are known automorphisms
+    up front, so symmetric chains stay polynomial.
+    """
+    best = {}
+    automorphisms = twin_swaps(colour, out_edges, in_edges)
+
+    def encode(order):
+        position = {v: i for i, v in enumerate(order)}
+        return sorted([position[v], position[w], q] for v in order for w, q in out_edges[v])
+
+    def search(colour, fixed):
+        colour = refine(colour, out_edges, in_edges)
+        cells = {}
+        for v, c in colour.items():
+            cells.setdefault(c, []).append(v)
+        shared = [c for c, members in cells.items() if len(members) > 1]
+        if not shared:
+            order = sorted(colour, key=colour.get)
+            encoding = encode(order)
+            if 'encoding' not in best or encoding < best['encoding']:
+                best.update(encoding=encoding, order=order, path=fixed)
+            elif encoding == best['encoding']:
+                automorphisms.append({v: w for v, w in zip(best['order'], order) if v != w})
+                # The rest of the subtree below the split from the best path maps onto
+                # that path's subtree, which is already done: jump back to the split
+                split = 0
+                while split < len(fixed) and fixed[split] == best['path'][split]:
+                    split += 1
+                return split
+            return None
+        # Orbit of the states tried so far under the automorphisms that fix `fixed`
+        stabilizer, checked, reached = [], 0, set()
+        for v in cells[min(shared)]:
+            found = [g for g in automorphisms[checked:] if all(g.get(u, u) == u for u in fixed)]
+            checked = len(automorphisms)
+            stabilizer.extend(found)
+            if found:
+                spread(reached, list(reached), stabilizer)
+            if v in reached:
+                continue
+            reached.add(v)
+            spread(reached, [v], stabilizer)
+            # Just below its old colour, so v sorts first among its former cell-mates
+            split = search({**colour, v: colour[v] - 0.5}, fixed + [v])
+            if split is not None and split < len(fixed):
+                return split
+        return None
+
+    search(colour, [])
+    return best['order']
+
+
+def canonicalize(chain, precision=DEFAULT_PRECISION):
+    """
+    Layout- and id-free form of a chain: {"states": [names], "transitions": [[from, to, q]]}
+    with from/to as indices into the canonically ordered states and
+    q = round(probability * 10**precision).
+    """
+    scale = 10 ** precision
+    states = [s for s in chain.get('states') or [] if isinstance(s, dict) and 'id' in s]
+    names = {s['id']: str(s.get('name') if s.get('name') is not None else s['id']) for s in states}
+
+    # Sum duplicate edges first, as buildTransitionMatrix does, then quantize
+    mass = {}
+    for t in chain.get('transitions') or []:
+        src, dst = t.get('from'), t.get('to')
+        if src in names and dst in names:
+            mass[(src, dst)] = mass.get((src, dst), 0.0) + float(t.get('probability') or 0)
+    edges = {key: round(p * scale) for key, p in mass.items()}
+    edges = {key: q for key, q in edges.items() if q}
+
+    # States sort by name; equal names are told apart by their edges, never by their ids
+    out_edges = {sid: [] for sid in names}
+    in_edges = {sid: [] for sid in names}
+    for (src, dst), q in edges.items():
+        out_edges[src].append((dst, q))
+        in_edges[dst].append((src, q))
+    name_rank = {name: i for i, name in enumerate(sorted(set(names.values())))}
+    order = canonical_order({sid: name_rank[names[sid]] for sid in names}, out_edges, in_edges) if names else []
+    position = {sid: i for i, sid in enumerate(order)}
+    return {
+        'states': [names[sid] for sid in order],
+        'transitions': sorted([position[src], position[dst], q] for (src, dst), q in edges.items()),
+        'precision': precision,
+    }
+
+
+def canonical_hash(canonical):
+    encoded = json.dumps(canonical, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def canonical_analysis(canonical):
+    """Analyze the canonical chain; state ids are canonical positions ("0", "1", ...), since names can repeat"""
+    scale = 10 ** canonical['precision']
+    states = [{'id': str(i)} for i in range(len(canonical['states']))]
+    transitions = [{'from': str(i), 'to': str(j), 'probability': q / scale} for i, j, q in canonical['transitions']]
+    return analyze(states, transitions)
+
+
+def display_analysis(analysis, canonical):
+    """Copy of a cached analysis with canonical positions replaced by state names, for reports"""
+    names = canonical['states']
+    properties = analysis['chainProperties']
+    return {
+        **analysis,
+        'chainProperties': {
+            **properties,
+            'communicatingClasses': [[names[int(i)] for i in members] for members in properties['communicatingClasses']],
+            'absorbingStates': [names[int(i)] for i in properties['absorbingStates']],
+        },
+    }
+
+
+def iter_designs(paths):
+    """Yield (key, name, chain, stored bytes) from designs.json files or user_designs dumps"""
+    for path in paths:
+        if path.endswith('.json'):
+            with open(path, 'r', encoding='utf-8') as f:
+                designs = json.load(f)
+            for design in designs:
+                chain = design.get('chain')
+                yield f"{Path(path).name}:{design['id']}", design.get('name'), chain, len(json.dumps(chain))
+        else:
+            for row in iter_rows(path):
+                raw = row.get('chain_data')
+                try:
+                    chain = jsonb(raw)
+                except ValueError:
+                    chain = None
+                stored = len(raw) if isinstance(raw, str) else len(json.dumps(raw))
+                yield f"{row.get('user_id')}:{row.get('design_id')}", row.get('name'), chain, stored
+
+
+def load_cache(path):
+    """Analyses keyed by canonical hash; caches from another CACHE_VERSION start empty"""
+    if path and Path(path).exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') == CACHE_VERSION:
+            return cache['analyses']
+    return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deduplicate saved designs by canonical hash')
+    parser.add_argument('inputs', nargs='*', help='designs.json files or user_designs .jsonl/.csv dumps (default: data/designs.json)')
+    parser.add_argument('--examples', default=str(EXAMPLES_PATH))
+    parser.add_argument('--precision', type=int, default=DEFAULT_PRECISION, help='decimal places kept from probabilities')
+    parser.add_argument('--analysis-cache', help='JSON file of analyses keyed by canonical hash, read and updated')
+    parser.add_argument('--map', dest='map_path', help='write one {"key", "hash"} line per design here')
+    parser.add_argument('-o', '--output', help='write the dedup report (distinct chains and their counts) here')
+    args = parser.parse_args()
+
+    inputs = args.inputs or [str(DESIGNS_PATH)]
+    missing = [path for path in inputs if not Path(path).exists()]
+    if missing:
+        sys.exit(f"❌ No such file: {', '.join(missing)}")
+    with open(args.examples, 'r', encoding='utf-8') as f:
+        examples = json.load(f)
+
+    # Stock examples seed the table, so their entries exist before any user copy is seen
+    entries = {}
+    for example in examples:
+        canonical = canonicalize(example['design'], args.precision)
+        digest = canonical_hash(canonical)
+        entries.setdefault(digest, {'canonical': canonical, 'stock': example['id'], 'count': 0, 'bytes': 0})
+
+    mapping = open(args.map_path, 'w', encoding='utf-8') if args.map_path else None
+    designs = malformed = stored_bytes = 0
+    try:
+        for key, name, chain, stored in iter_designs(inputs):
+            if not isinstance(chain, dict):
+                malformed += 1
+                continue
+            canonical = canonicalize(chain, args.precision)
+            digest = canonical_hash(canonical)
+            entry = entries.setdefault(digest, {'canonical': canonical, 'stock': None, 'count': 0, 'bytes': 0})
+            entry['count'] += 1
+            entry['bytes'] = entry['bytes'] or stored
+            designs += 1
+            stored_bytes += stored
+            if mapping:
+                mapping.write(json.dumps({'key': key, 'name': name, 'hash': digest, 'stock': entry['stock']}) + '\n')
+    finally:
+        if mapping:
+            mapping.close()
+
+    cache = load_cache(args.analysis_cache)
+    analyzed = 0
+    for digest, entry in entries.items():
+        if digest not in cache:
+            cache[digest] = canonical_analysis(entry['canonical'])
+            analyzed += 1
+    if args.analysis_cache:
+        with open(args.analysis_cache, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'analyses': cache}, f, ensure_ascii=False)
+            f.write('\n')
+
+    used = {digest: entry for digest, entry in entries.items() if entry['count']}
+    if args.output:
+        report = {
+            'precision': args.precision,
+            'designs': designs,
+            'distinct': len(used),
+            'chains': [
+                {'hash': digest, **entry, 'analysis': display_analysis(cache[digest], entry['canonical'])}
+                for digest, entry in sorted(used.items(), key=lambda item: -item[1]['count'])
+            ],
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+
+    stock = [entry for entry in used.values() if entry['stock']]
+    for entry in sorted(stock, key=lambda e: -e['count']):
+        print(f"  📋 {entry['stock']}: {entry['count']} copies")
+    unique_bytes = sum(entry['bytes'] for entry in used.values())
+    print(f'✅ {designs} designs, {len(used)} distinct ({sum(e["count"] for e in stock)} copies of stock examples), '
+          f'{malformed} malformed; {stored_bytes / 1024:.0f}K stored, {unique_bytes / 1024:.0f}K after dedup; '
+          f'{analyzed} chains analyzed, {len(entries) - analyzed} from cache', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Multi-pattern emoji and callout marker scanner for Markov Learning Lab content
+- Compiles a configurable marker set once into an Aho–Corasick automaton over code points
+- Grapheme-aware: variation selectors (U+FE0E/U+FE0F) are optional inside markers, and a
+  match never starts or ends inside a larger emoji sequence (ZWJ, skin tone, keycap, tags)
+- Classifies, strips or rewrites every match in a single linear pass over the text
+"""
+
+import argparse
+import json
+from collections import Counter, deque
+from pathlib import Path
+
+from content_json import write_json
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LMS_PATH = REPO_ROOT / 'data' / 'lms.json'
+
+VARIATION_SELECTORS = {'\ufe0e', '\ufe0f'}
+ZWJ = '\u200d'
+
+# Icons that used to open list items before the content cleanup (see enhance_content.py)
+LINE_ICONS = ['🌦️', '🏭', '💰', '🤖', '🌐', '📞', '🧬', '🎮', '🔍', '🩺', '🎲', '🎯', '🎨', '🔗', '📝', '✨']
+# Emoji that head blockquote callouts (> **💡 Title**)
+CALLOUT_ICONS = ['💡', '📊', '⚠️', '📌', '✅', '❌']
+
+DEFAULT_MARKERS = {
+    'icon': LINE_ICONS,
+    'callout': CALLOUT_ICONS,
+}
+
+
+def is_extender(char):
+    """Code points that continue the preceding emoji grapheme"""
+    code = ord(char)
+    return (
+        char == ZWJ
+        or 0x1F3FB <= code <= 0x1F3FF      # skin tone modifiers
+        or code == 0x20E3                  # combining enclosing keycap
+        or 0xE0020 <= code <= 0xE007F      # tag sequences (subdivision flags)
+    )
+
+
+class Match:
+    __slots__ = ('start', 'end', 'marker', 'category')
+
+    def __init__(self, start, end, marker, category):
+        self.start = start
+        self.end = end
+        self.marker = marker
+        self.category = category
+
+    def __repr__(self):
+        return f'Match({self.start}, {self.end}, {self.marker!r}, {self.category!r})'
+
+
+class MarkerScanner:
+    """
+    Aho–Corasick automaton over marker code points. Build cost is linear in the
+    total marker length and scanning is linear in the text, however many markers
+    are loaded.
+    """
+
+    def __init__(self, markers=None):
+        markers = DEFAULT_MARKERS if markers is None else markers
+        self.goto = [{}]
+        self.fail = [0]
+        # Longest marker ending at each node: (length in code points without selectors, marker, category)
+        self.output = [None]
+        self.max_length = 0
+        for category, items in markers.items():
+            for marker in items:
+                self._add(marker, category)
+        self._link()
+
+    def _add(self, marker, category):
+        key = [c for c in marker if c not in VARIATION_SELECTORS]
+        if not key:
+            raise ValueError(f'marker {marker!r} has no code points besides variation selectors')
+        node = 0
+        for char in key:
+            nxt = self.goto[node].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][char] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(None)
+            node = nxt
+        if self.output[node] is None:
+            self.output[node] = (len(key), marker, category)
+        self.max_length = max(self.max_length, len(key))
+
+    def _link(self):
+        """Breadth-first failure links; each node inherits the longest output on its failure chain"""
+        # Depth-1 nodes fail to the root, which their zero-initialized links already say
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and char not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[child] = self.goto[f].get(char, 0)
+                if self.output[child] is None:
+                    self.output[child] = self.output[self.fail[child]]
+
+    def _raw_matches(self, text):
+        """Yield (start, end, marker, category) for the longest marker ending at each position"""
+        goto, fail, output = self.goto, self.fail, self.output
+        node = 0
+        # Text offsets of the last code points fed to the automaton (selectors are skipped)
+        fed = deque(maxlen=max(self.max_length, 1))
+        for i, char in enumerate(text):
+            if char in VARIATION_SELECTORS:
+                continue
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            fed.append(i)
+            hit = output[node]
+            if hit:
+                length, marker, category = hit
+                yield fed[-length], i + 1, marker, category
+
+    def scan(self, text):
+        """Leftmost-longest, non-overlapping marker matches that sit on grapheme boundaries"""
+        candidates = sorted(self._raw_matches(text), key=lambda m: (m[0], -m[1]))
+        matches = []
+        last_end = 0
+        n = len(text)
+        for start, end, marker, category in candidates:
+            if start < last_end:
+                continue
+            # Swallow a trailing variation selector so stripping removes it too
+            while end < n and text[end] in VARIATION_SELECTORS:
+                end += 1
+            if end < n and is_extender(text[end]):
+                continue
+            prev = start - 1
+            while prev >= 0 and text[prev] in VARIATION_SELECTORS:
+                prev -= 1
+            if prev >= 0 and (text[prev] == ZWJ or is_extender(text[start])):
+                continue
+            matches.append(Match(start, end, marker, category))
+            last_end = end
+        return matches
+
+    def classify(self, text):
+        """Count matches per category"""
+        return Counter(m.category for m in self.scan(text))
+
+    def rewrite(self, text, replacements):
+        """
+        Replace matches in one pass. `replacements` maps a marker or a category to
+        its replacement string (marker wins); unmapped matches are left alone.
+        """
+        out = []
+        pos = 0
+        for m in self.scan(text):
+            replacement = replacements.get(m.marker, replacements.get(m.category))
+            if replacement is None:
+                continue
+            out.append(text[pos:m.start])
+            out.append(replacement)
+            pos = m.end
+        out.append(text[pos:])
+        return ''.join(out)
+
+    def strip_lines(self, text, categories=None):
+        """
+        Drop lines whose first non-blank grapheme is a marker followed by whitespace,
+        the rule remove_emoji_lines in enhance_content.py applies.
+        """
+        starts = {
+            m.start: m.end for m in self.scan(text)
+            if categories is None or m.category in categories
+        }
+        kept = []
+        offset = 0
+        for line in text.split('\n'):
+            first = offset + len(line) - len(line.lstrip())
+            end = starts.get(first)
+            offset += len(line) + 1
+            if end is not None and end < offset - 1 and text[end].isspace():
+                continue
+            kept.append(line)
+        return '\n'.join(kept)
+
+
+def load_markers(path):
+    """Marker file: {"category": ["emoji", ...], ...}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        markers = json.load(f)
+    if not isinstance(markers, dict) or not all(isinstance(v, list) for v in markers.values()):
+        raise SystemExit(f'{path}: expected an object mapping categories to lists of markers')
+    return markers
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report or strip emoji markers in lesson content')
+    parser.add_argument('--markers', help='JSON marker set (default: built-in icon and callout markers)')
+    parser.add_argument('--lms', default=str(LMS_PATH))
+    parser.add_argument('--strip-lines', metavar='CATEGORY', action='append',
+                        help='remove lines that start with a marker of this category and write lms.json back')
+    args = parser.parse_args()
+
+    scanner = MarkerScanner(load_markers(args.markers) if args.markers else None)
+    with open(args.lms, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    totals = Counter()
+    for lesson in data['lessons']:
+        counts = scanner.classify(lesson['content'])
+        totals.update(counts)
+        if counts:
+            print(f"  {lesson['id']}: " + ', '.join(f'{c} × {n}' for c, n in sorted(counts.items())))
+        if args.strip_lines:
+            lesson['content'] = scanner.strip_lines(lesson['content'], set(args.strip_lines))
+
+    if args.strip_lines:
+        changed = write_json(args.lms, data)
+        print(f"{'✏️  Rewrote' if changed else '✅ No changes to'} {args.lms}")
+    print('✅ ' + (', '.join(f'{c}: {n}' for c, n in sorted(totals.items())) or 'no markers found'))
+
+
+if __name__ == '__main__':
+    main()
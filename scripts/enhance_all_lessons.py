@@ -11,6 +11,8 @@ Complete content enhancement for all Markov Learning Lab lessons
 import json
 import re
 
+from content_json import write_json
+
 def enhance_foundations_2():
     """Enhance Conditional Probability lesson with Monty Hall problem"""
     return """# When Information Changes Everything: The Power of Conditional Probability
@@ -739,8 +741,7 @@ for lesson in data['lessons']:
         lesson['description'] = "Discover the memoryless Markov property and enter the world of stochastic processes with state transitions and equilibrium distributions."
 
 # Save enhanced version
-with open('/home/lept0n5/Git/Markov-Learning-Lab/data/lms.json', 'w') as f:
-    json.dump(data, f, indent=2, ensure_ascii=False)
+write_json('/home/lept0n5/Git/Markov-Learning-Lab/data/lms.json', data)
 
 print("✅ All 4 lessons enhanced successfully!")
 print("  - Foundations 1: Kolmogorov axioms, historical context, pop culture refs")
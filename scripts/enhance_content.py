@@ -7,15 +7,14 @@ Removes emoji icons, adds depth, pedagogical terminology, and pop culture refere
 import json
 import re
 
+from content_json import write_json
+from emoji_scanner import LINE_ICONS, MarkerScanner
+
+ICON_SCANNER = MarkerScanner({'icon': LINE_ICONS})
+
 def remove_emoji_lines(content):
     """Remove lines that start with emoji icons"""
-    lines = content.split('\n')
-    cleaned = []
-    for line in lines:
-        # Skip lines starting with common emojis
-        if not re.match(r'^\s*[🌦️🏭💰🤖🌐📞🧬🎮🔍🩺🎲🎯🎨🔗📝✨]\s', line):
-            cleaned.append(line)
-    return '\n'.join(cleaned)
+    return ICON_SCANNER.strip_lines(content)
 
 def fix_html_divs(content):
     """Convert problematic HTML divs to proper blockquotes or callouts"""
@@ -228,8 +227,7 @@ for lesson in data['lessons']:
     lesson['content'] = fix_html_divs(lesson['content'])
 
 # Save
-with open('/home/lept0n5/Git/Markov-Learning-Lab/data/lms.json', 'w') as f:
-    json.dump(data, f, indent=2)
+write_json('/home/lept0n5/Git/Markov-Learning-Lab/data/lms.json', data)
 
 print("✅ Content enhancement complete!")
 print("  - Removed emoji icons")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Precomputed wrap points for long display equations
+- Port of smartWrapEquation (lib/equation-wrapper.ts): same operator list, priorities,
+  standalone-operator checks, fallbacks and continuation indents, so lines match the client
+- Walks every display math block (```math fences and $$...$$) in data/lms.json lessons and
+  all string fields of data/examples.json; inline math is never wrapped by the renderer
+- Wraps each distinct expression at a fixed set of column widths; the renderer uses
+  min(100, innerWidth / 8) columns, so 40, 48, 60, 80 and 100 cover phones up to desktop
+- Writes public/prerendered/equation-wraps.json keyed by the SHA-256 of the trimmed
+  LaTeX; expressions that fit at a width have no entry for it (they render as one line)
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+
+from payload_budget import collect_text, iter_math
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LMS_PATH = REPO_ROOT / 'data' / 'lms.json'
+EXAMPLES_PATH = REPO_ROOT / 'data' / 'examples.json'
+OUTPUT_PATH = REPO_ROOT / 'public' / 'prerendered' / 'equation-wraps.json'
+
+# Bump together with lib/equation-wrapper.ts when the wrapping rules change
+WRAP_VERSION = 1
+
+DEFAULT_WIDTHS = [40, 48, 60, 80, 100]
+
+# Order matters: at one position the first standalone match wins
+OPERATORS = [
+    '\\pm', '\\mp', '\\times', '\\cdot', '\\div', '\\sum', '\\prod', '\\int',
+    '\\leq', '\\geq', '\\neq', '\\approx', '\\equiv',
+    '=', '+', '-',
+]
+INDENTING_OPERATORS = {'=', '\\sum', '\\prod', '\\int'}
+INDENT_SIZE = 2
+BOUNDARY_RE = re.compile(r'[\s=+\-*/{}()\[\],;]')
+DIGIT_RE = re.compile(r'[0-9]')
+SPACE_RE = re.compile(r'[\s,]')
+FORCED_RE = re.compile(r'[\s,}]')
+
+
+def is_boundary(char):
+    """Empty (string edge) or a separator character, like the client's regex on undefined"""
+    return not char or BOUNDARY_RE.match(char) is not None
+
+
+def char_at(text, i):
+    return text[i] if 0 <= i < len(text) else ''
+
+
+def find_operator(remaining, start, end):
+    """Rightmost standalone operator in remaining[start:end] → (split offset, operator) or (-1, '')"""
+    for i in range(end - 1, start - 1, -1):
+        for op in OPERATORS:
+            if not remaining.startswith(op, i):
+                continue
+            before = char_at(remaining, i - 1)
+            after = char_at(remaining, i + len(op))
+            if op.startswith('\\'):
+                if (i == 0 or is_boundary(before)) and is_boundary(after):
+                    return i + len(op), op
+                continue
+            # A minus between digits is part of a number or range, not an operator
+            if op == '-' and DIGIT_RE.match(before or ' ') and DIGIT_RE.match(char_at(remaining, i + 1) or ' '):
+                continue
+            if is_boundary(before) and is_boundary(after):
+                return i + len(op), op
+    return -1, ''
+
+
+def smart_wrap(latex, max_width=80):
+    """Lines smartWrapEquation(latex, max_width) returns, for an integer max_width"""
+    if len(latex) <= max_width:
+        return [latex]
+    lines = []
+    remaining = latex.strip()
+    indent_level = 0
+    while len(remaining) > max_width:
+        search_start = max(0, len(remaining) - max_width)
+        search_end = len(remaining)
+        split, operator = find_operator(remaining, search_start, search_end)
+
+        # Fallbacks: a space or comma, then a closing brace or paren, then near max_width
+        if split == -1:
+            split = next((i + 1 for i in range(search_end - 1, search_start - 1, -1)
+                          if SPACE_RE.match(remaining[i])), -1)
+        if split == -1:
+            split = next((i + 1 for i in range(search_end - 1, search_start - 1, -1)
+                          if remaining[i] in '})'), -1)
+        if split == -1:
+            split = next((i + 1 for i in range(max_width, max(max_width - 10, 0) - 1, -1)
+                          if FORCED_RE.match(char_at(remaining, i))), max_width)
+
+        line = remaining[:split].strip()
+        if line:
+            lines.append(' ' * (indent_level * INDENT_SIZE) + line)
+            if operator in INDENTING_OPERATORS:
+                indent_level += 1
+
+        following = remaining[split:].strip()
+        if operator and following and not following.startswith(operator):
+            following = operator + ' ' + following
+        if following == remaining:
+            # No progress; the client would loop here, so keep the rest on one line
+            break
+        remaining = following
+
+    if remaining:
+        lines.append(' ' * (indent_level * INDENT_SIZE) + remaining)
+    return lines
+
+
+def iter_display_math(lms, examples):
+    """Yield (source, tex) for every display expression in lessons and examples"""
+    for lesson in lms.get('lessons', []):
+        for display, tex in iter_math(lesson.get('content') or ''):
+            if display and tex:
+                yield f"lesson:{lesson['id']}", tex
+    for example in examples:
+        for text in collect_text(example):
+            for display, tex in iter_math(text):
+                if display and tex:
+                    yield f"example:{example['id']}", tex
+
+
+def expression_hash(tex):
+    return hashlib.sha256(tex.encode('utf-8')).hexdigest()
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute equation wrap points for fixed column widths')
+    parser.add_argument('--lms', default=str(LMS_PATH))
+    parser.add_argument('--examples', default=str(EXAMPLES_PATH))
+    parser.add_argument('--widths', type=int, nargs='+', default=DEFAULT_WIDTHS, help='wrap widths in columns')
+    parser.add_argument('-o', '--output', default=str(OUTPUT_PATH))
+    args = parser.parse_args()
+
+    widths = sorted(set(args.widths))
+    if widths[0] < 1:
+        sys.exit('❌ Widths must be positive')
+
+    expressions = {}
+    total = 0
+    for source, tex in iter_display_math(load_json(args.lms), load_json(args.examples)):
+        total += 1
+        entry = expressions.setdefault(expression_hash(tex), {'tex': tex, 'sources': set()})
+        entry['sources'].add(source)
+
+    equations = {}
+    for digest, entry in expressions.items():
+        tex = entry['tex']
+        if len(tex) <= widths[0]:
+            continue
+        lines = {}
+        for width in widths:
+            wrapped = smart_wrap(tex, width)
+            if len(wrapped) > 1:
+                lines[str(width)] = wrapped
+        if lines:
+            equations[digest] = {'length': len(tex), 'sources': sorted(entry['sources']), 'lines': lines}
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'version': WRAP_VERSION, 'widths': widths, 'equations': dict(sorted(equations.items()))},
+                  f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    print(f'✅ {total} display expressions ({len(expressions)} distinct), '
+          f'{len(equations)} wrap at {widths[0]}+ columns → {output}')
+
+
+if __name__ == '__main__':
+    main()
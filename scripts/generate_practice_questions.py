@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Parametric practice-question generator for Markov Learning Lab
+- Question templates declare parameter grids and vectorized answer/distractor formulas
+- Parameters are sampled in bulk and answers computed with NumPy, one batch at a time
+- Near-identical variants are dropped: two variants are the same question when they show
+  the same rounded answer and agree on the template's `distinct_by` parameters (all of them
+  by default), so e.g. a 0.1% change of prevalence that leaves the answer unchanged is a repeat
+- Records stream out in the data/practice-questions.json schema, with lesson_id (migration 007)
+- Requires NumPy
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LMS_PATH = REPO_ROOT / 'data' / 'lms.json'
+
+OPTION_IDS = ['a', 'b', 'c', 'd']
+
+
+def grid(low, high, step):
+    """Parameter range sampled on a fixed grid, so displayed values are exact"""
+    return {'low': low, 'high': high, 'step': step}
+
+
+def bayes_answer(p):
+    return p['sens'] * p['prev'] / (p['sens'] * p['prev'] + p['fpr'] * (1 - p['prev']))
+
+
+def bayes_distractors(p):
+    return [
+        p['sens'],                      # base rate neglect: P(T|D) read as P(D|T)
+        1 - p['fpr'],                   # specificity read as the answer
+        p['sens'] * p['prev'],          # forgot to divide by P(T)
+        p['prev'],                      # ignored the test entirely
+    ]
+
+
+def two_step_answer(p):
+    return (1 - p['a']) ** 2 + p['a'] * p['b']
+
+
+def two_step_distractors(p):
+    return [
+        (1 - p['a']) ** 2,              # only the stay-stay path
+        1 - p['a'],                     # one step instead of two
+        p['a'] * p['b'],                # only the leave-return path
+        (1 - p['a']) * p['b'],          # multiplied the wrong entries
+    ]
+
+
+def stationary_answer(p):
+    return p['b'] / (p['a'] + p['b'])
+
+
+def stationary_distractors(p):
+    return [
+        p['a'] / (p['a'] + p['b']),     # swapped the two states
+        1 - p['a'],                     # self-loop probability
+        p['b'],                         # raw return probability
+        np.full_like(p['a'], 0.5),      # assumed a uniform equilibrium
+    ]
+
+
+TEMPLATES = {
+    'bayes-medical-test': {
+        'lesson_id': 'foundations-2',
+        'title': 'Medical Test Paradox',
+        'difficulty': 'medium',
+        'tags': ['bayes-theorem', 'conditional-probability', 'generated'],
+        'params': {
+            'prev': grid(0.001, 0.2, 0.001),
+            'sens': grid(0.80, 0.99, 0.01),
+            'fpr': grid(0.01, 0.15, 0.01),
+        },
+        'answer': bayes_answer,
+        'distractors': bayes_distractors,
+        # Prevalence moves on a 0.1% grid; steps that leave the shown answer unchanged are repeats
+        'distinct_by': ('sens', 'fpr'),
+        'question': (
+            'A disease affects {prev_pct} of the population. A test has sensitivity {sens_pct} '
+            'and a false positive rate of {fpr_pct}. A randomly chosen person tests positive. '
+            'What is the probability they actually have the disease?'
+        ),
+        'hint': 'Use the Law of Total Probability to find $P(T)$ first, then apply Bayes\' theorem.',
+        'solution': (
+            'A positive result raises the probability of disease from the prior {prev_pct} '
+            'to **{answer_pct}**; the other positive results are false positives from the healthy group.'
+        ),
+        'math_explanation': (
+            '$$P(T) = P(T|D)P(D) + P(T|\\neg D)P(\\neg D) = ({sens})({prev}) + ({fpr})(1 - {prev})$$\n\n'
+            '$$P(D|T) = \\frac{{P(T|D)P(D)}}{{P(T)}} \\approx {answer}$$'
+        ),
+    },
+    'two-step-transition': {
+        'lesson_id': 'chains-2',
+        'title': 'Two-Step Transition Probability',
+        'difficulty': 'easy',
+        'tags': ['chapman-kolmogorov', 'transition-matrix', 'generated'],
+        'params': {
+            'a': grid(0.05, 0.95, 0.05),
+            'b': grid(0.05, 0.95, 0.05),
+        },
+        'answer': two_step_answer,
+        'distractors': two_step_distractors,
+        'question': (
+            'A two-state Markov chain moves from state 1 to state 2 with probability {a} '
+            'and from state 2 to state 1 with probability {b}. Starting in state 1, '
+            'what is the probability of being in state 1 after exactly two steps?'
+        ),
+        'hint': 'Sum over the two paths 1 → 1 → 1 and 1 → 2 → 1, or compute $P^2$.',
+        'solution': 'The chain is in state 1 after two steps with probability **{answer}**.',
+        'math_explanation': (
+            '$$P = \\begin{{pmatrix}} 1 - {a} & {a} \\\\ {b} & 1 - {b} \\end{{pmatrix}}$$\n\n'
+            '$$P^2_{{11}} = (1 - {a})^2 + ({a})({b}) \\approx {answer}$$'
+        ),
+    },
+    'two-state-stationary': {
+        'lesson_id': 'chains-3',
+        'title': 'Two-State Stationary Distribution',
+        'difficulty': 'medium',
+        'tags': ['stationary-distribution', 'equilibrium', 'generated'],
+        'params': {
+            'a': grid(0.05, 0.95, 0.05),
+            'b': grid(0.05, 0.95, 0.05),
+        },
+        'answer': stationary_answer,
+        'distractors': stationary_distractors,
+        'question': (
+            'A two-state Markov chain moves from state 1 to state 2 with probability {a} '
+            'and from state 2 to state 1 with probability {b}. In the long run, what fraction '
+            'of time does the chain spend in state 1?'
+        ),
+        'hint': 'Solve $\\pi P = \\pi$ with $\\pi_1 + \\pi_2 = 1$; balance the flow between the two states.',
+        'solution': 'The stationary probability of state 1 is **{answer}**.',
+        'math_explanation': (
+            'Balance requires $\\pi_1 \\cdot {a} = \\pi_2 \\cdot {b}$, so\n\n'
+            '$$\\pi_1 = \\frac{{{b}}}{{{a} + {b}}} \\approx {answer}$$'
+        ),
+    },
+}
+
+
+def near_keys(template, indices, answer, precision):
+    """Per-row dedupe key: displayed answer plus the grid indices of the `distinct_by` parameters"""
+    names = list(template['params'])
+    columns = [names.index(name) for name in template.get('distinct_by', names)]
+    shown = np.rint(np.nan_to_num(answer) * 10 ** precision).astype(np.int64)
+    return np.column_stack([shown, indices[:, columns]])
+
+
+def sample_params(spec, size, rng):
+    """Draw `size` grid points per parameter; returns (values, grid indices)"""
+    values = {}
+    indices = []
+    for name, g in spec.items():
+        steps = int(round((g['high'] - g['low']) / g['step'])) + 1
+        idx = rng.integers(0, steps, size=size)
+        values[name] = np.round(g['low'] + idx * g['step'], 6)
+        indices.append(idx)
+    return values, np.stack(indices, axis=1)
+
+
+def pick_distractors(answer, candidates, precision):
+    """
+    Choose three distractors per row: rounded candidates that lie in [0, 1] and
+    differ from the answer and from each other. Rows without three valid
+    candidates get a mask of False.
+    """
+    shown = np.round(answer, precision)
+    fallbacks = [answer + 0.1, answer - 0.1, answer / 2, 1 - answer]
+    cands = np.round(np.stack(list(candidates) + fallbacks, axis=1), precision)
+    valid = (cands >= 0) & (cands <= 1) & (cands != shown[:, None])
+    for j in range(1, cands.shape[1]):
+        repeats = (cands[:, :j] == cands[:, j:j + 1]) & valid[:, :j]
+        valid[:, j] &= ~repeats.any(axis=1)
+    order = np.argsort(~valid, axis=1, kind='stable')[:, :3]
+    chosen = np.take_along_axis(cands, order, axis=1)
+    ok = valid.sum(axis=1) >= 3
+    return chosen, ok
+
+
+def format_fields(params, answer, precision):
+    """String fields available to a template's text for one variant"""
+    fields = {}
+    for name, value in params.items():
+        fields[name] = f'{value:g}'
+        fields[f'{name}_pct'] = f'{value * 100:g}%'
+    fields['answer'] = f'{answer:.{precision}f}'
+    fields['answer_pct'] = f'{answer * 100:.1f}%'
+    return fields
+
+
+def generate(template_key, count, rng, question_type='multiple_choice', status='draft', precision=3, batch_size=10000):
+    """Yield up to `count` distinct question records for one template"""
+    template = TEMPLATES[template_key]
+    seen = set()
+    produced = 0
+    # Stop once a batch yields nothing new: the distinct variants are exhausted
+    while produced < count:
+        values, indices = sample_params(template['params'], batch_size, rng)
+        answer = template['answer'](values)
+        distractors, ok = pick_distractors(answer, template['distractors'](values), precision)
+        # Shuffle where the correct option lands, per row
+        slots = rng.permuted(np.tile(np.arange(4), (batch_size, 1)), axis=1)
+
+        keys = near_keys(template, indices, answer, precision)
+        _, first = np.unique(keys, axis=0, return_index=True)
+        keep = np.zeros(batch_size, dtype=bool)
+        keep[first] = True
+        keep &= ok & np.isfinite(answer)
+
+        new = 0
+        for row in np.flatnonzero(keep):
+            key = keys[row].tobytes()
+            if key in seen:
+                continue
+            seen.add(key)
+            new += 1
+            params = {name: float(v[row]) for name, v in values.items()}
+            yield build_record(
+                template_key, template, params, float(answer[row]), distractors[row], slots[row],
+                question_type, status, precision,
+            )
+            produced += 1
+            if produced >= count:
+                return
+        if new == 0:
+            return
+
+
+def build_record(template_key, template, params, answer, distractors, slots, question_type, status, precision):
+    """Render one variant into the practice-questions schema"""
+    fields = format_fields(params, answer, precision)
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:10]
+    record = {
+        'id': f"{template['lesson_id']}-{template_key}-{digest}",
+        'title': template['title'],
+        'question': template['question'].format(**fields),
+        'type': question_type,
+    }
+    if question_type == 'multiple_choice':
+        texts = [fields['answer']] + [f'{d:.{precision}f}' for d in distractors]
+        options = [None] * 4
+        for text, slot in zip(texts, slots):
+            options[slot] = text
+        correct_slot = int(slots[0])
+        record['options'] = [
+            {'id': OPTION_IDS[i], 'text': text, 'correct': i == correct_slot}
+            for i, text in enumerate(options)
+        ]
+    else:
+        record['correct_answer'] = fields['answer']
+    record.update({
+        'hint': template['hint'],
+        'solution': template['solution'].format(**fields),
+        'math_explanation': template['math_explanation'].format(**fields),
+        'difficulty': template['difficulty'],
+        'tags': list(template['tags']),
+        'status': status,
+        'lesson_id': template['lesson_id'],
+    })
+    return record
+
+
+def check_lesson_ids(templates):
+    """Fail early if a template points at a lesson that no longer exists"""
+    with open(LMS_PATH, 'r', encoding='utf-8') as f:
+        lesson_ids = {lesson['id'] for lesson in json.load(f)['lessons']}
+    missing = sorted({TEMPLATES[t]['lesson_id'] for t in templates} - lesson_ids)
+    if missing:
+        raise SystemExit(f"Unknown lesson ids in templates: {', '.join(missing)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate practice question variants from parametric templates')
+    parser.add_argument('-t', '--template', action='append', choices=sorted(TEMPLATES),
+                        help='template to use (repeatable, default: all)')
+    parser.add_argument('-n', '--count', type=int, default=1000, help='variants per template')
+    parser.add_argument('--type', choices=['multiple_choice', 'numeric_input'], default='multiple_choice')
+    parser.add_argument('--publish', action='store_true', help="emit status 'published' instead of 'draft'")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', required=True,
+                        help='.json for the admin import format ({"questions": [...]}), .jsonl for one record per line')
+    args = parser.parse_args()
+
+    templates = args.template or sorted(TEMPLATES)
+    check_lesson_ids(templates)
+    rng = np.random.default_rng(args.seed)
+    status = 'published' if args.publish else 'draft'
+    as_jsonl = args.output.endswith('.jsonl')
+
+    total = 0
+    with open(args.output, 'w', encoding='utf-8') as f:
+        if not as_jsonl:
+            f.write('{\n  "questions": [\n')
+        for template_key in templates:
+            made = 0
+            for record in generate(template_key, args.count, rng, args.type, status):
+                line = json.dumps(record, ensure_ascii=False)
+                if as_jsonl:
+                    f.write(line + '\n')
+                else:
+                    f.write(('' if total == 0 else ',\n') + '    ' + line)
+                total += 1
+                made += 1
+            if made < args.count:
+                print(f'⚠️  {template_key}: only {made} distinct variants in the parameter grid', file=sys.stderr)
+        if not as_jsonl:
+            f.write('\n  ]\n}\n')
+
+    print(f'✅ Generated {total} practice questions from {len(templates)} templates → {args.output}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+"""
+Batch grammar validation for Markov Learning Lab
+Python port of lib/grammar-parser.ts (parseGrammar, grammarToChain) and
+lib/language-analysis.ts (analyzeLanguage) for checking large exercise sets:
+- Parses the same `S → aA | ε` notation with the same errors
+- Compiles the converted automaton to integer-indexed CSR adjacency
+- Runs emptiness and finiteness as linear-time graph passes
+- Fans grammars out across a process pool and writes one JSON line per grammar
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# JS `\w` is ASCII-only
+ARROW_RE = re.compile(r'^(\w+)\s*→\s*(.+)$', re.ASCII)
+VARIABLE_RE = re.compile(r'^[A-Z][A-Z0-9]*$')
+EPSILON = ('ε', 'epsilon', '')
+
+
+def is_upper(char):
+    return 'A' <= char <= 'Z'
+
+
+def is_variable_char(char):
+    return is_upper(char) or '0' <= char <= '9'
+
+
+def tokenize_alternative(alt, variables, terminals):
+    """Split one alternative into symbols: A-Z[A-Z0-9]* is a variable, other non-space runs are terminals"""
+    symbols = []
+    current = ''
+    i = 0
+    while i < len(alt):
+        char = alt[i]
+        if is_upper(char):
+            if current:
+                symbols.append(current)
+                terminals[current] = None
+            j = i + 1
+            while j < len(alt) and is_variable_char(alt[j]):
+                j += 1
+            current = alt[i:j]
+            symbols.append(current)
+            variables[current] = None
+            current = ''
+            i = j
+            continue
+        if char.isspace():
+            if current:
+                terminals[current] = None
+                symbols.append(current)
+                current = ''
+        else:
+            current += char
+        i += 1
+    if current:
+        terminals[current] = None
+        symbols.append(current)
+    return symbols
+
+
+def parse_grammar(text):
+    """Port of parseGrammar: returns {'grammar': dict | None, 'errors': [...]}"""
+    errors = []
+    # Dicts as insertion-ordered sets, matching JS Set iteration order
+    variables = {}
+    terminals = {}
+    production_map = {}
+    start_variable = None
+
+    for number, raw in enumerate(text.split('\n'), start=1):
+        line = raw.strip()
+        if not line or line.startswith('#') or line.startswith('//'):
+            continue
+
+        match = ARROW_RE.match(line)
+        if not match:
+            errors.append({
+                'line': number,
+                'column': 0,
+                'message': 'Invalid production rule format. Expected: Variable → alternatives',
+            })
+            continue
+
+        variable = match.group(1).strip()
+        if not VARIABLE_RE.match(variable):
+            errors.append({
+                'line': number,
+                'column': 0,
+                'message': f'Invalid variable name "{variable}". Variables should be uppercase letters (e.g., S, A, B)',
+            })
+            continue
+
+        variables[variable] = None
+        if start_variable is None:
+            start_variable = variable
+
+        alternatives = []
+        for alt in (part.strip() for part in match.group(2).strip().split('|')):
+            if alt in EPSILON:
+                alternatives.append([])
+            else:
+                alternatives.append(tokenize_alternative(alt, variables, terminals))
+        production_map.setdefault(variable, []).extend(alternatives)
+
+    if errors:
+        return {'grammar': None, 'errors': errors}
+
+    productions = sorted(
+        ({'variable': v, 'alternatives': alts} for v, alts in production_map.items()),
+        key=lambda p: (p['variable'] != start_variable, p['variable']),
+    )
+    grammar = {
+        'variables': list(variables),
+        'terminals': list(terminals),
+        'startVariable': start_variable or 'S',
+        'productions': productions,
+    }
+    return {'grammar': grammar, 'errors': []}
+
+
+class Automaton:
+    """
+    Integer-indexed form of the chain grammarToChain builds.
+
+    States are numbered in `grammar['variables']` order; labeled transitions are
+    stored in CSR form (`offsets`, `targets`, `labels`) in production order, which
+    is the order the TypeScript analysis walks them in.
+    """
+
+    def __init__(self, names, initial, final, edges, transition_count):
+        self.names = names
+        self.initial = initial
+        self.final = final
+        self.transition_count = transition_count
+        n = len(names)
+        offsets = [0] * (n + 1)
+        for source, _, _ in edges:
+            offsets[source + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        cursor = offsets[:-1]
+        targets = [0] * len(edges)
+        labels = [''] * len(edges)
+        for source, target, label in edges:
+            targets[cursor[source]] = target
+            labels[cursor[source]] = label
+            cursor[source] += 1
+        self.offsets = offsets
+        self.targets = targets
+        self.labels = labels
+
+    def __len__(self):
+        return len(self.names)
+
+    def successors(self, state):
+        for e in range(self.offsets[state], self.offsets[state + 1]):
+            yield self.targets[e], self.labels[e]
+
+    def initial_states(self):
+        return [i for i, flag in enumerate(self.initial) if flag]
+
+
+def grammar_to_automaton(grammar):
+    """Port of grammarToChain, minus layout: returns (Automaton | None, errors)"""
+    variable_set = set(grammar['variables'])
+
+    cfg_productions = []
+    for production in grammar['productions']:
+        for alt in production['alternatives']:
+            if not alt:
+                continue
+            count = sum(1 for s in alt if s in variable_set)
+            if count > 1 or (count == 1 and alt[-1] not in variable_set):
+                cfg_productions.append(f"{production['variable']} → {''.join(alt)}")
+    if cfg_productions:
+        errors = [
+            'This grammar is context-free (CFG), not regular. Regular grammars can only be converted to finite automata (DFA/NFA).',
+            'CFG productions detected:',
+            *(f'  • {p}' for p in cfg_productions[:5]),
+        ]
+        if len(cfg_productions) > 5:
+            errors.append(f'  ... and {len(cfg_productions) - 5} more')
+        errors += [
+            'Why this is CFG:',
+            '  • Variables appear in the middle of productions (not just at the end)',
+            '  • Multiple variables can appear in a single production',
+            '  • Examples: "E → E + T" (variable at start), "F → (E)" (variable in middle)',
+            'To convert a CFG, you would need a Pushdown Automaton (PDA), which is not currently supported.',
+            'For regular grammars, use the form:',
+            '  Variable → terminal(s) + optional Variable (at end only)',
+            '  Example: S → aA | bB | ε',
+        ]
+        return None, errors
+
+    index = {v: i for i, v in enumerate(grammar['variables'])}
+    terminal_set = set(grammar['terminals'])
+    names = list(grammar['variables'])
+    initial = [v == grammar['startVariable'] for v in names]
+    final = [False] * len(names)
+    edges = []
+    transition_count = 0
+    errors = []
+
+    for production in grammar['productions']:
+        source = index.get(production['variable'])
+        if source is None:
+            continue
+        for alt in production['alternatives']:
+            if not alt:
+                final[source] = True
+                continue
+            terminal = ''.join(s for s in alt if s in terminal_set)
+            target = next((s for s in alt if s in variable_set), None)
+            if not terminal and target is None:
+                errors.append(f"Invalid alternative in production {production['variable']}: {''.join(alt)}")
+                continue
+            if target is None:
+                final[source] = True
+                continue
+            transition_count += 1
+            # Unit productions (S → A) become unlabeled transitions, which the analysis ignores
+            if terminal:
+                edges.append((source, index[target], terminal[0]))
+
+    return Automaton(names, initial, final, edges, transition_count), errors
+
+
+def get_alphabet(automaton):
+    return sorted({label for label in automaton.labels if len(label) == 1})
+
+
+def is_empty_language(automaton):
+    """BFS from the initial states over labeled edges; empty unless a final state is reached"""
+    if not automaton.labels:
+        return False
+    starts = automaton.initial_states()
+    if not starts or not any(automaton.final):
+        return True
+    seen = bytearray(len(automaton))
+    queue = deque(starts)
+    for s in starts:
+        seen[s] = 1
+    while queue:
+        state = queue.popleft()
+        if automaton.final[state]:
+            return False
+        for target, _ in automaton.successors(state):
+            if not seen[target]:
+                seen[target] = 1
+                queue.append(target)
+    return True
+
+
+def is_finite_language(automaton):
+    """
+    Matches isFiniteLanguage: infinite iff a cycle of non-final states is reachable
+    from an initial state without passing through a final state. Done as a BFS for
+    reachability followed by Kahn's algorithm on the reachable non-final subgraph.
+    """
+    if not automaton.labels:
+        return False
+    if not any(automaton.final):
+        return False
+
+    final = automaton.final
+    reachable = bytearray(len(automaton))
+    queue = deque()
+    for s in automaton.initial_states():
+        if not reachable[s]:
+            reachable[s] = 1
+            queue.append(s)
+    while queue:
+        state = queue.popleft()
+        if final[state]:
+            continue
+        for target, _ in automaton.successors(state):
+            if not reachable[target]:
+                reachable[target] = 1
+                queue.append(target)
+
+    def inner(state):
+        return reachable[state] and not final[state]
+
+    indegree = [0] * len(automaton)
+    nodes = [s for s in range(len(automaton)) if inner(s)]
+    for state in nodes:
+        for target, _ in automaton.successors(state):
+            if inner(target):
+                indegree[target] += 1
+    queue = deque(s for s in nodes if indegree[s] == 0)
+    removed = 0
+    while queue:
+        state = queue.popleft()
+        removed += 1
+        for target, _ in automaton.successors(state):
+            if inner(target):
+                indegree[target] -= 1
+                if indegree[target] == 0:
+                    queue.append(target)
+    return removed == len(nodes)
+
+
+def is_universal_language(automaton, alphabet):
+    """Same heuristic as the TypeScript: every state final and complete over the alphabet"""
+    if not automaton.labels or not alphabet:
+        return False
+    if not automaton.initial_states() or not all(automaton.final):
+        return False
+    return all(
+        len({label for _, label in automaton.successors(s)}) == len(alphabet)
+        for s in range(len(automaton))
+    )
+
+
+def accepted_examples(automaton, count=5):
+    """Breadth-first shortest accepted strings, capped at 20 symbols"""
+    starts = automaton.initial_states()
+    if not starts or not any(automaton.final):
+        return []
+    examples = []
+    queue = deque((s, '') for s in starts)
+    seen = set()
+    while queue and len(examples) < count:
+        state, path = queue.popleft()
+        if (state, path) in seen:
+            continue
+        seen.add((state, path))
+        if automaton.final[state] and path:
+            examples.append(path)
+            continue
+        if len(path) < 20:
+            for target, label in automaton.successors(state):
+                queue.append((target, path + label))
+    return examples
+
+
+def accepts(automaton, text):
+    """Deterministic run from the first initial state, taking the first matching edge"""
+    starts = automaton.initial_states()
+    if not starts:
+        return False
+    state = starts[0]
+    for char in text:
+        state = next((t for t, label in automaton.successors(state) if label == char), None)
+        if state is None:
+            return False
+    return automaton.final[state]
+
+
+def rejected_examples(automaton, alphabet, count=5, rng=None):
+    """Random strings the automaton rejects (seeded, unlike Math.random in the TypeScript)"""
+    if not alphabet:
+        return []
+    rng = rng or random.Random(0)
+    examples = []
+    for _ in range(100):
+        if len(examples) >= count:
+            break
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 10)))
+        if not accepts(automaton, text) and text not in examples:
+            examples.append(text)
+    return examples
+
+
+def regular_expression(automaton, alphabet):
+    if alphabet and len(automaton) == 1 and automaton.initial[0] and automaton.final[0]:
+        return f'{alphabet[0]}*' if len(alphabet) == 1 else f"({'|'.join(alphabet)})*"
+    return None
+
+
+def analyze_language(automaton, seed=0):
+    """Port of analyzeLanguage, returning the same LanguageAnalysis shape"""
+    if not automaton.labels:
+        return {
+            'languageType': 'unknown',
+            'acceptedExamples': [],
+            'rejectedExamples': [],
+            'properties': {'isFinite': False, 'isEmpty': False, 'isUniversal': False, 'alphabet': []},
+            'description': 'Not a finite automaton (no transition labels)',
+        }
+
+    alphabet = get_alphabet(automaton)
+    empty = is_empty_language(automaton)
+    finite = is_finite_language(automaton)
+    universal = is_universal_language(automaton, alphabet)
+
+    if empty:
+        description = 'Empty language (no accepting paths)'
+    elif universal:
+        description = 'Universal language (accepts all strings)'
+    elif finite:
+        description = 'Finite language (finite set of strings)'
+    else:
+        description = 'Infinite regular language'
+
+    analysis = {
+        'languageType': 'regular',
+        'acceptedExamples': [] if empty else accepted_examples(automaton),
+        'rejectedExamples': [] if empty else rejected_examples(automaton, alphabet, rng=random.Random(seed)),
+        'properties': {'isFinite': finite, 'isEmpty': empty, 'isUniversal': universal, 'alphabet': alphabet},
+        'description': description,
+    }
+    regex = regular_expression(automaton, alphabet)
+    if regex:
+        analysis['regularExpression'] = regex
+    return analysis
+
+
+def check_grammar(item):
+    """Parse, convert and analyze one (id, text) pair into a report dict"""
+    grammar_id, text = item
+    report = {'id': grammar_id}
+    parsed = parse_grammar(text)
+    if parsed['errors']:
+        report['parseErrors'] = parsed['errors']
+        return report
+    grammar = parsed['grammar']
+    report['startVariable'] = grammar['startVariable']
+    report['variables'] = grammar['variables']
+    report['terminals'] = grammar['terminals']
+
+    automaton, errors = grammar_to_automaton(grammar)
+    if errors:
+        report['conversionErrors'] = errors
+    if automaton is None:
+        return report
+    report['states'] = len(automaton)
+    report['transitions'] = automaton.transition_count
+    report['analysis'] = analyze_language(automaton)
+    return report
+
+
+def iter_grammars(paths):
+    """
+    Yield (id, text) pairs. `.jsonl` files hold one object per line with a
+    `grammar` field (and optional `id`); `.json` files hold a list of such
+    objects or bare strings; any other file is a single grammar.
+    """
+    for path in paths:
+        path = Path(path)
+        if path.suffix == '.jsonl':
+            with open(path, 'r', encoding='utf-8') as f:
+                for number, line in enumerate(f, start=1):
+                    if line.strip():
+                        entry = json.loads(line)
+                        yield entry.get('id', f'{path.name}:{number}'), entry['grammar']
+        elif path.suffix == '.json':
+            with open(path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            for i, entry in enumerate(entries):
+                if isinstance(entry, str):
+                    yield f'{path.name}[{i}]', entry
+                else:
+                    yield entry.get('id', f'{path.name}[{i}]'), entry['grammar']
+        else:
+            yield path.name, path.read_text(encoding='utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parse and analyze grammars in bulk')
+    parser.add_argument('inputs', nargs='+', help='.jsonl/.json grammar collections or plain grammar files')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='worker processes (1 = in-process)')
+    parser.add_argument('--chunk-size', type=int, default=256, help='grammars sent to a worker at a time')
+    parser.add_argument('-o', '--output', help='write JSON lines here instead of stdout')
+    args = parser.parse_args()
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    executor = ProcessPoolExecutor(max_workers=args.jobs) if args.jobs > 1 else None
+    totals = {'grammars': 0, 'invalid': 0, 'empty': 0, 'finite': 0}
+    try:
+        items = iter_grammars(args.inputs)
+        if executor:
+            reports = executor.map(check_grammar, items, chunksize=args.chunk_size)
+        else:
+            reports = map(check_grammar, items)
+        for report in reports:
+            totals['grammars'] += 1
+            if 'parseErrors' in report or 'analysis' not in report:
+                totals['invalid'] += 1
+            else:
+                properties = report['analysis']['properties']
+                totals['empty'] += properties['isEmpty']
+                totals['finite'] += properties['isFinite']
+            out.write(json.dumps(report, ensure_ascii=False) + '\n')
+    finally:
+        if executor:
+            executor.shutdown()
+        if out is not sys.stdout:
+            out.close()
+
+    print(
+        f"✅ Checked {totals['grammars']} grammars: {totals['invalid']} invalid or non-regular, "
+        f"{totals['empty']} empty, {totals['finite']} finite",
+        file=sys.stderr,
+    )
+
+
+if __name__ == '__main__':
+    main()
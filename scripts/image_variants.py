@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Responsive image variants for Markov Learning Lab static assets
+- Resizes every raster image under public/ (screenshots, placeholders) to standard widths
+  in AVIF, WebP and a JPEG fallback (PNG for images with transparency)
+- Sources are processed in parallel across a process pool, one worker per image
+- Skips sources whose content hash and settings match the previous run, so re-runs are free
+- Writes public/variants/manifest.json with srcset strings under stable keys: `avif`, `webp`
+  and `fallback` (JPEG, or PNG for images with transparency; the entry's `fallbackType` says which)
+- Requires Pillow (AVIF needs a Pillow build with AVIF support and is skipped otherwise)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageOps, features
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+PUBLIC_DIR = REPO_ROOT / 'public'
+OUTPUT_DIR = PUBLIC_DIR / 'variants'
+
+# Bump when encoding changes, so every source is re-encoded
+VARIANTS_VERSION = 2
+
+DEFAULT_WIDTHS = [320, 640, 960, 1280, 1920]
+SOURCE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp'}
+EXTENSIONS = {'avif': 'avif', 'webp': 'webp', 'jpeg': 'jpg', 'png': 'png'}
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp', 'jpeg': 'image/jpeg', 'png': 'image/png'}
+SAVE_OPTIONS = {
+    'avif': lambda q: {'quality': q, 'speed': 6},
+    'webp': lambda q: {'quality': q, 'method': 6},
+    'jpeg': lambda q: {'quality': q, 'optimize': True, 'progressive': True},
+    'png': lambda q: {'optimize': True},
+}
+
+
+def file_hash(path, settings):
+    """Source bytes plus everything that affects the output"""
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode())
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def has_alpha(image):
+    return image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+
+
+def target_widths(source_width, widths):
+    """Standard widths below the source, plus the source width itself; never upscale"""
+    return sorted({w for w in widths if w < source_width} | {source_width})
+
+
+def build_variants(job):
+    """Worker: write every width/format variant of one source and return its manifest entry"""
+    source, url, out_base, widths, formats, quality, digest = job
+    with Image.open(source) as opened:
+        image = ImageOps.exif_transpose(opened)
+        alpha = has_alpha(image)
+        image = image.convert('RGBA' if alpha else 'RGB')
+    # The `jpeg` format is the fallback; JPEG cannot carry transparency, so those images get PNG
+    fallback = 'png' if alpha else 'jpeg'
+
+    entry = {'hash': digest, 'width': image.width, 'height': image.height, 'variants': {}, 'srcset': {}}
+    if 'jpeg' in formats:
+        entry['fallbackType'] = MIME_TYPES[fallback]
+    # Largest first, each step resized from the previous one to keep LANCZOS cheap
+    current = image
+    resized = []
+    for width in reversed(target_widths(image.width, widths)):
+        height = max(1, round(image.height * width / image.width))
+        if current.width != width:
+            current = current.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+        resized.append(current)
+
+    for key in formats:
+        fmt = fallback if key == 'jpeg' else key
+        key = 'fallback' if key == 'jpeg' else key
+        variants = []
+        for img in reversed(resized):
+            path = Path(f'{out_base}-{img.width}.{EXTENSIONS[fmt]}')
+            path.parent.mkdir(parents=True, exist_ok=True)
+            img.save(path, fmt.upper(), **SAVE_OPTIONS[fmt](quality[fmt]))
+            variants.append({
+                'src': '/' + path.relative_to(PUBLIC_DIR).as_posix(),
+                'width': img.width,
+                'height': img.height,
+                'bytes': path.stat().st_size,
+            })
+        entry['variants'][key] = variants
+        entry['srcset'][key] = ', '.join(f"{v['src']} {v['width']}w" for v in variants)
+    return url, entry, len(resized)
+
+
+def find_sources(root, output_dir):
+    for path in sorted(root.rglob('*')):
+        if path.suffix.lower() in SOURCE_SUFFIXES and output_dir not in path.parents:
+            yield path
+
+
+def remove_variants(entry):
+    for variants in entry['variants'].values():
+        for variant in variants:
+            (PUBLIC_DIR / variant['src'].lstrip('/')).unlink(missing_ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate responsive image variants and a srcset manifest')
+    parser.add_argument('--widths', type=int, nargs='+', default=DEFAULT_WIDTHS)
+    parser.add_argument('--formats', nargs='+', choices=['avif', 'webp', 'jpeg'], default=['avif', 'webp', 'jpeg'])
+    parser.add_argument('--quality', type=int, default=80, help='WebP/JPEG quality; AVIF uses 15 points less')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='worker processes (1 = in-process)')
+    parser.add_argument('--force', action='store_true', help='re-encode every source')
+    args = parser.parse_args()
+
+    formats = list(args.formats)
+    if 'avif' in formats and not features.check('avif'):
+        print('⚠️  This Pillow build has no AVIF support; skipping AVIF', file=sys.stderr)
+        formats.remove('avif')
+    quality = {'avif': max(1, args.quality - 15), 'webp': args.quality, 'jpeg': args.quality, 'png': None}
+    settings = {'version': VARIANTS_VERSION, 'widths': sorted(args.widths), 'formats': formats, 'quality': args.quality}
+
+    manifest_path = OUTPUT_DIR / 'manifest.json'
+    previous = {}
+    if manifest_path.exists() and not args.force:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)['images']
+
+    images = {}
+    jobs = []
+    for source in find_sources(PUBLIC_DIR, OUTPUT_DIR):
+        rel = source.relative_to(PUBLIC_DIR)
+        url = '/' + rel.as_posix()
+        digest = file_hash(source, settings)
+        cached = previous.get(url)
+        if cached and cached['hash'] == digest and all(
+            (PUBLIC_DIR / v['src'].lstrip('/')).exists() for vs in cached['variants'].values() for v in vs
+        ):
+            images[url] = cached
+            continue
+        if cached:
+            remove_variants(cached)
+        out_base = OUTPUT_DIR / rel.parent / rel.stem
+        jobs.append((str(source), url, str(out_base), args.widths, formats, quality, digest))
+
+    executor = ProcessPoolExecutor(max_workers=args.jobs) if args.jobs > 1 and len(jobs) > 1 else None
+    try:
+        results = executor.map(build_variants, jobs) if executor else map(build_variants, jobs)
+        for url, entry, width_count in results:
+            images[url] = entry
+            print(f"  🖼️  {url}: {width_count} widths × {len(formats)} formats")
+    finally:
+        if executor:
+            executor.shutdown()
+
+    # Sources that were deleted take their variants with them
+    for url in set(previous) - set(images):
+        remove_variants(previous[url])
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({'settings': settings, 'images': dict(sorted(images.items()))}, f, indent=2)
+        f.write('\n')
+
+    source_bytes = sum((PUBLIC_DIR / url.lstrip('/')).stat().st_size for url in images)
+    smallest = sum(min(v[0]['bytes'] for v in entry['variants'].values()) for entry in images.values() if entry['variants'])
+    print(f'✅ {len(jobs)} encoded, {len(images) - len(jobs)} unchanged; '
+          f'{source_bytes / 1024:.0f}K of sources, {smallest / 1024:.0f}K at the smallest width → {manifest_path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+N-gram Markov chain trainer for Markov Learning Lab
+- Streams text corpora (files, stdin, lesson content) line by line
+- Interns tokens to integer ids and packs each n-gram into one 64-bit key
+- Sorts and counts bounded buffers with NumPy into runs spilled to disk, then k-way merges
+  the runs block by block, so memory stays bounded for corpora of hundreds of MB
+- --min-count prunes rare n-grams from the final table
+- Exports a pruned top-k chain in the `design` states/transitions format
+- Requires NumPy
+"""
+
+import argparse
+import heapq
+import json
+import math
+import re
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LMS_PATH = REPO_ROOT / 'data' / 'lms.json'
+
+WORD_RE = re.compile(r"\w+(?:'\w+)*|[^\w\s]")
+WHITESPACE_RE = re.compile(r'\s+')
+
+UNK_ID = 0
+UNK_TOKEN = '<unk>'
+
+# Same palette as the stock designs in data/examples.json
+PALETTE = ['#fbbf24', '#60a5fa', '#34d399', '#a78bfa', '#f87171', '#fb923c', '#94a3b8']
+
+
+class TokenTable:
+    """Interns tokens to dense integer ids, mapping overflow to <unk>"""
+
+    def __init__(self, max_vocab):
+        self.max_vocab = max_vocab
+        self.ids = {UNK_TOKEN: UNK_ID}
+        self.tokens = [UNK_TOKEN]
+
+    def intern(self, token):
+        token_id = self.ids.get(token)
+        if token_id is not None:
+            return token_id
+        if len(self.tokens) > self.max_vocab:
+            return UNK_ID
+        token_id = len(self.tokens)
+        self.ids[token] = token_id
+        self.tokens.append(token)
+        return token_id
+
+
+class Run:
+    """A sorted (keys, counts) run spilled to disk as two raw uint64 files"""
+
+    __slots__ = ('path', 'length', 'level')
+
+    def __init__(self, path, length, level=0):
+        self.path = path
+        self.length = length
+        self.level = level
+
+    def arrays(self):
+        if not self.length:
+            return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.uint64)
+        return (
+            np.memmap(f'{self.path}.keys', dtype=np.uint64, mode='r', shape=(self.length,)),
+            np.memmap(f'{self.path}.counts', dtype=np.uint64, mode='r', shape=(self.length,)),
+        )
+
+    def remove(self):
+        for suffix in ('.keys', '.counts'):
+            Path(self.path + suffix).unlink(missing_ok=True)
+
+
+def sum_duplicates(keys, counts):
+    """Collapse equal adjacent keys of a sorted run, summing their counts"""
+    if not len(keys):
+        return keys, counts
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    return keys[starts], np.add.reduceat(counts, starts)
+
+
+def merge_runs(runs, path, block_size, min_count=1):
+    """
+    k-way merge of sorted runs into one run file, summing equal keys.
+
+    Works block by block: every key up to the smallest last key among the
+    sources' next blocks is merged at once, so no key straddles two steps and
+    memory stays at about one block per source. With min_count, rarer keys are
+    dropped (only valid for the final merge, when counts are complete).
+    """
+    sources = [run.arrays() for run in runs]
+    positions = [0] * len(sources)
+    length = 0
+    with open(f'{path}.keys', 'wb') as keys_file, open(f'{path}.counts', 'wb') as counts_file:
+        while True:
+            live = [i for i, (keys, _) in enumerate(sources) if positions[i] < len(keys)]
+            if not live:
+                break
+            cutoff = min(sources[i][0][min(positions[i] + block_size, len(sources[i][0])) - 1] for i in live)
+            key_parts, count_parts = [], []
+            for i in live:
+                keys, counts = sources[i]
+                pos = positions[i]
+                window = np.asarray(keys[pos:pos + block_size])
+                take = int(np.searchsorted(window, cutoff, side='right'))
+                key_parts.append(window[:take])
+                count_parts.append(np.asarray(counts[pos:pos + take]))
+                positions[i] = pos + take
+            keys = np.concatenate(key_parts)
+            order = np.argsort(keys, kind='stable')
+            keys, counts = sum_duplicates(keys[order], np.concatenate(count_parts)[order])
+            if min_count > 1:
+                keep = counts >= min_count
+                keys, counts = keys[keep], counts[keep]
+            keys.tofile(keys_file)
+            counts.tofile(counts_file)
+            length += len(keys)
+    return Run(path, length, max(run.level for run in runs) + 1)
+
+
+class NGramCounts:
+    """
+    Counts n-grams as packed 64-bit keys in sorted runs spilled to disk.
+
+    Each n-gram (t1, ..., tn) is packed as t1 << (n-1)*bits | ... | tn, so all
+    successors of one context sit in a contiguous, sorted slice of the keys —
+    the table is effectively a CSR matrix with the context as the row.
+
+    A full buffer is sorted and counted with NumPy and written out as a run.
+    Runs are merged `fan_in` at a time into runs one level up, as in an LSM tree,
+    so each n-gram is rewritten O(log_fan_in(runs)) times and memory stays at the
+    buffer plus one block per merged run, whatever the corpus size.
+    """
+
+    def __init__(self, order, bits, buffer_size, spill_dir=None, fan_in=16, min_count=1):
+        if order < 2:
+            raise ValueError('order must be at least 2')
+        if order * bits > 64:
+            raise ValueError(
+                f'order {order} with {bits}-bit token ids does not fit in 64 bits; '
+                'lower --order or --max-vocab'
+            )
+        if fan_in < 2:
+            raise ValueError('fan-in must be at least 2')
+        self.order = order
+        self.bits = bits
+        self.token_mask = (1 << bits) - 1
+        self.key_mask = (1 << (order * bits)) - 1
+        self.buffer_size = buffer_size
+        self.fan_in = fan_in
+        self.min_count = min_count
+        self.buffer = array('Q')
+        self.workdir = tempfile.TemporaryDirectory(prefix='ngram-runs-', dir=spill_dir)
+        self.runs = []
+        self.next_run = 0
+        self.keys = self.counts = None
+        self.total = 0
+
+    def add_sequence(self, token_ids):
+        """Count every n-gram in a token id stream (context resets per call)"""
+        key = 0
+        filled = 0
+        buffer = self.buffer
+        for token_id in token_ids:
+            key = ((key << self.bits) | token_id) & self.key_mask
+            filled += 1
+            if filled >= self.order:
+                buffer.append(key)
+                if len(buffer) >= self.buffer_size:
+                    self.flush()
+
+    def run_path(self):
+        self.next_run += 1
+        return str(Path(self.workdir.name) / f'run-{self.next_run}')
+
+    def flush(self):
+        """Sort and count the pending buffer into a level-0 run, merging full levels"""
+        if not self.buffer:
+            return
+        keys, counts = np.unique(np.frombuffer(self.buffer, dtype=np.uint64), return_counts=True)
+        self.total += len(self.buffer)
+        del self.buffer[:]
+        run = Run(self.run_path(), len(keys))
+        keys.tofile(f'{run.path}.keys')
+        counts.astype(np.uint64).tofile(f'{run.path}.counts')
+        self.runs.append(run)
+        self.keys = self.counts = None
+        # Runs are appended in level order, so a full level is always the tail
+        while len(self.runs) >= self.fan_in and all(r.level == self.runs[-1].level for r in self.runs[-self.fan_in:]):
+            self.runs[-self.fan_in:] = [self.merge(self.runs[-self.fan_in:])]
+
+    def merge(self, runs, min_count=1):
+        # Split the buffer's budget between the sources, so a merge holds about one buffer
+        merged = merge_runs(runs, self.run_path(), max(self.buffer_size // len(runs), 4096), min_count)
+        for run in runs:
+            run.remove()
+        return merged
+
+    def finish(self):
+        """Merge everything into the final table (pruning keys under min_count) and map it"""
+        self.flush()
+        if self.keys is not None:
+            return
+        if len(self.runs) > 1 or (self.runs and self.min_count > 1):
+            self.runs = [self.merge(self.runs, self.min_count)]
+        if self.runs:
+            self.keys, self.counts = self.runs[0].arrays()
+        else:
+            self.keys = self.counts = np.zeros(0, dtype=np.uint64)
+
+    def blocks(self, size=None):
+        """Yield (keys, counts) slices of the final table, never splitting a context's row"""
+        self.finish()
+        size = size or self.buffer_size
+        bits = np.uint64(self.bits)
+        n = len(self.keys)
+        start = 0
+        while start < n:
+            end = min(start + size, n)
+            if end < n:
+                # Extend to the end of the last context in the block
+                following = ((int(self.keys[end - 1]) >> self.bits) + 1) << self.bits
+                end = n if following >> 64 else int(np.searchsorted(self.keys, np.uint64(following)))
+            yield np.asarray(self.keys[start:end]), np.asarray(self.counts[start:end])
+            start = end
+
+    def rows(self, keys, counts):
+        """Row boundaries of a block: (contexts, starts, totals)"""
+        contexts = keys >> np.uint64(self.bits)
+        starts = np.flatnonzero(np.concatenate(([True], contexts[1:] != contexts[:-1])))
+        return contexts[starts], starts, np.add.reduceat(counts, starts)
+
+    def context_tokens(self, context):
+        """Unpack a context key into its (order - 1) token ids"""
+        context = int(context)
+        ids = []
+        for _ in range(self.order - 1):
+            ids.append(context & self.token_mask)
+            context >>= self.bits
+        return ids[::-1]
+
+
+def tokenize_line(line, level, lowercase):
+    """Split one line into tokens; character level collapses whitespace to a single space"""
+    if lowercase:
+        line = line.lower()
+    if level == 'word':
+        return WORD_RE.findall(line)
+    line = WHITESPACE_RE.sub(' ', line).strip()
+    return list(line + ' ') if line else []
+
+
+def iter_documents(paths, include_lessons):
+    """Yield documents as iterables of lines, streaming files from disk"""
+    for path in paths:
+        if path == '-':
+            yield sys.stdin
+            continue
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            yield f
+    if include_lessons:
+        with open(LMS_PATH, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for lesson in data['lessons']:
+            if lesson.get('status', 'published') == 'published':
+                yield lesson['content'].split('\n')
+
+
+def train(paths, order, level, include_lessons=False, lowercase=True, max_vocab=65535, buffer_size=1 << 20,
+          min_count=1, spill_dir=None):
+    """Stream the corpus and return (token table, n-gram counts)"""
+    table = TokenTable(max_vocab)
+    counts = NGramCounts(order, max_vocab.bit_length(), buffer_size, spill_dir=spill_dir, min_count=min_count)
+    for document in iter_documents(paths, include_lessons):
+        counts.add_sequence(
+            table.intern(token)
+            for line in document
+            for token in tokenize_line(line, level, lowercase)
+        )
+    counts.finish()
+    return table, counts
+
+
+def normalize_row(successors, precision):
+    """Turn (target, count) pairs into rounded probabilities that sum to exactly 1"""
+    total = sum(count for _, count in successors)
+    probs = [round(count / total, precision) for _, count in successors]
+    # Push rounding drift onto the most likely successor
+    probs[0] = round(probs[0] + 1 - sum(probs), precision)
+    return [(target, p) for (target, _), p in zip(successors, probs) if p > 0]
+
+
+def export_design(table, counts, level, max_states=50, top_k=5, precision=3):
+    """Build a pruned design: the most frequent contexts, each with its top-k retained successors"""
+    order = counts.order
+    bits = np.uint64(counts.bits)
+    context_mask = np.uint64((1 << ((order - 1) * counts.bits)) - 1)
+
+    # Pass 1: the max_states contexts with the most occurrences (ties to the larger context)
+    best_contexts = np.zeros(0, dtype=np.uint64)
+    best_totals = np.zeros(0, dtype=np.uint64)
+    for keys, block_counts in counts.blocks():
+        contexts, _, totals = counts.rows(keys, block_counts)
+        best_contexts = np.concatenate((best_contexts, contexts))
+        best_totals = np.concatenate((best_totals, totals))
+        top = np.lexsort((best_contexts, best_totals))[::-1][:max_states]
+        best_contexts, best_totals = best_contexts[top], best_totals[top]
+    kept = best_contexts.tolist()
+    index = {context: i for i, context in enumerate(kept)}
+    kept_sorted = np.sort(best_contexts)
+
+    joiner = '' if level == 'char' else ' '
+
+    def label(context):
+        text = joiner.join(table.tokens[t] for t in counts.context_tokens(context))
+        return text.replace(' ', '␣') if level == 'char' else text
+
+    cols = max(1, math.ceil(math.sqrt(len(kept))))
+    states = [
+        {
+            'id': f's{i}',
+            'name': label(context),
+            'x': 300 + (i % cols) * 250,
+            'y': 300 + (i // cols) * 250,
+            'color': PALETTE[i % len(PALETTE)],
+        }
+        for i, context in enumerate(kept)
+    ]
+
+    # Pass 2: n-grams whose context and successor context (its last order - 1 tokens) are both kept
+    successors = {}
+    for keys, block_counts in counts.blocks():
+        sources = keys >> bits
+        targets = keys & context_mask
+        keep = np.isin(sources, kept_sorted) & np.isin(targets, kept_sorted)
+        for source, target, count in zip(sources[keep].tolist(), targets[keep].tolist(), block_counts[keep].tolist()):
+            successors.setdefault(index[source], []).append((index[target], count))
+
+    transitions = []
+    # Rows in table (context key) order
+    for source in sorted(successors, key=lambda i: kept[i]):
+        row = heapq.nlargest(top_k, successors[source], key=lambda s: s[1])
+        for target, probability in normalize_row(row, precision):
+            transitions.append({
+                'id': f's{source}-s{target}',
+                'from': f's{source}',
+                'to': f's{target}',
+                'probability': probability,
+            })
+
+    return {'states': states, 'transitions': transitions}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train an n-gram Markov chain and export it as a design')
+    parser.add_argument('inputs', nargs='*', help="text files to train on ('-' for stdin)")
+    parser.add_argument('--lessons', action='store_true', help='also train on lesson content from data/lms.json')
+    parser.add_argument('--level', choices=['char', 'word'], default='char')
+    parser.add_argument('--order', type=int, default=2, help='n-gram order (2 = bigram, states are single tokens)')
+    parser.add_argument('--max-vocab', type=int, default=65535, help='distinct tokens before mapping to <unk>')
+    parser.add_argument('--keep-case', action='store_true', help='do not lowercase input')
+    parser.add_argument('--buffer-size', type=int, default=1 << 20, help='n-grams buffered before each sorted run is spilled')
+    parser.add_argument('--min-count', type=int, default=1, help='drop n-grams seen fewer times than this')
+    parser.add_argument('--spill-dir', help='directory for sorted runs (default: the system temp dir)')
+    parser.add_argument('--max-states', type=int, default=50)
+    parser.add_argument('--top-k', type=int, default=5, help='successors kept per state')
+    parser.add_argument('-o', '--output', help='write design JSON here instead of stdout')
+    args = parser.parse_args()
+
+    if not args.inputs and not args.lessons:
+        parser.error('give at least one input file or --lessons')
+
+    try:
+        table, counts = train(
+            args.inputs,
+            args.order,
+            args.level,
+            include_lessons=args.lessons,
+            lowercase=not args.keep_case,
+            max_vocab=args.max_vocab,
+            buffer_size=args.buffer_size,
+            min_count=args.min_count,
+            spill_dir=args.spill_dir,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    design = export_design(table, counts, args.level, args.max_states, args.top_k)
+
+    payload = json.dumps(design, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(payload + '\n')
+    else:
+        print(payload)
+
+    print(
+        f"✅ Trained {args.level}-level order-{args.order} chain: "
+        f"{counts.total} n-grams, {len(counts.keys)} distinct, {len(table.tokens) - 1} tokens; "
+        f"exported {len(design['states'])} states / {len(design['transitions'])} transitions",
+        file=sys.stderr,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Payload budget checker for Markov Learning Lab content
+- Measures what each lesson, course and example costs on the wire: raw, gzip and
+  brotli bytes of the record as the API serves it (compact JSON)
+- Counts math (```math fences, $$display$$ and $inline$) and embedded components per item
+- Compares every measure against configurable budgets and exits non-zero on any overage,
+  so page-weight regressions are caught when content is authored
+- Brotli sizes need the optional `brotli` package. Without it the check fails while any brotli
+  budget is set, unless --no-brotli explicitly skips them (sizes are then reported as n/a)
+"""
+
+import argparse
+import gzip
+import json
+import re
+import sys
+from pathlib import Path
+
+from component_manifest import FENCE_OPEN_RE, scan_markdown
+from content_json import dumps
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LMS_PATH = REPO_ROOT / 'data' / 'lms.json'
+EXAMPLES_PATH = REPO_ROOT / 'data' / 'examples.json'
+
+METRICS = ('raw', 'gzip', 'brotli', 'math', 'components')
+
+# Bytes for the size metrics, counts for math and components; a budget file
+# overrides these per kind and per item ("lesson:<id>", "course:<id>", "example:<id>")
+DEFAULT_BUDGETS = {
+    'lesson': {'raw': 24576, 'gzip': 8192, 'brotli': 7168, 'math': 200},
+    'course': {'raw': 98304, 'gzip': 32768, 'brotli': 28672},
+    'example': {'raw': 16384, 'gzip': 6144, 'brotli': 5120},
+}
+
+CODE_SPAN_RE = re.compile(r'(`+)(?!`).+?(?<!`)\1(?!`)', re.DOTALL)
+# remark-math: $$display$$ (may span lines) and $inline$ (single line); \$ is a literal dollar,
+# outside math and inside it ($\$1$ is math), so inline bodies step over escapes pairwise
+MATH_RE = re.compile(r'(?<!\\)\$\$(.+?)(?<!\\)\$\$|(?<![\\$])\$(?!\$)((?:\\.|[^$\\\n])+?)\$', re.DOTALL)
+
+
+def split_fences(markdown):
+    """Yield (lang, text) runs: prose outside fences has lang None, fenced bodies their info string"""
+    segment = []
+    lines = markdown.split('\n')
+    i = 0
+    while i < len(lines):
+        fence = FENCE_OPEN_RE.match(lines[i])
+        if fence:
+            if segment:
+                yield None, '\n'.join(segment)
+                segment = []
+            marker, lang = fence.group(1), fence.group(2)
+            close = re.compile(rf'^\s*{re.escape(marker[0])}{{{len(marker)},}}\s*$')
+            start = i + 1
+            i += 1
+            while i < len(lines) and not close.match(lines[i]):
+                i += 1
+            yield lang, '\n'.join(lines[start:i])
+            i += 1
+            continue
+        segment.append(lines[i])
+        i += 1
+    if segment:
+        yield None, '\n'.join(segment)
+
+
+def iter_math(markdown):
+    """Yield (display, tex) for every math expression: ```math fences, $$display$$ and $inline$"""
+    for lang, text in split_fences(markdown):
+        if lang == 'math':
+            yield True, text.strip()
+            continue
+        if lang is not None:
+            continue
+        # Blank out code spans without shifting offsets
+        text = CODE_SPAN_RE.sub(lambda m: ' ' * len(m.group()), text)
+        for match in MATH_RE.finditer(text):
+            if match.group(1) is not None:
+                yield True, match.group(1).strip()
+            else:
+                yield False, match.group(2).strip()
+
+
+def collect_text(value):
+    """All string leaves of a JSON value, in document order"""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return [t for v in value.values() for t in collect_text(v)]
+    if isinstance(value, list):
+        return [t for v in value for t in collect_text(v)]
+    return []
+
+
+def measure(record, markdown, use_brotli=True):
+    """Wire sizes of `record` and math/component counts of its markdown"""
+    payload = dumps(record, 'compact').encode('utf-8')
+    math = list(iter_math(markdown))
+    blocks, _ = scan_markdown(markdown)
+    return {
+        'raw': len(payload),
+        'gzip': len(gzip.compress(payload, compresslevel=9, mtime=0)),
+        'brotli': len(brotli.compress(payload, quality=11)) if brotli and use_brotli else None,
+        'math': len(math),
+        'display_math': sum(1 for display, _ in math if display),
+        'components': len(blocks),
+    }
+
+
+def measure_content(lms, examples, use_brotli=True):
+    """Yield (kind, id, measures) for every lesson, course and example"""
+    lessons_by_course = {}
+    for lesson in lms['lessons']:
+        lessons_by_course.setdefault(lesson['courseId'], []).append(lesson)
+        yield 'lesson', lesson['id'], measure(lesson, lesson.get('content') or '', use_brotli)
+    for course in lms['courses']:
+        # A course page loads the course with all of its lessons
+        lessons = sorted(lessons_by_course.get(course['id'], []), key=lambda l: l.get('order') or 0)
+        record = {**course, 'lessons': lessons}
+        yield 'course', course['id'], measure(record, '\n'.join(l.get('content') or '' for l in lessons), use_brotli)
+    for example in examples:
+        yield 'example', example['id'], measure(example, '\n'.join(collect_text(example)), use_brotli)
+
+
+def load_budgets(path):
+    """Defaults merged with a budget file: {"lesson": {...}, "overrides": {"lesson:<id>": {...}}}"""
+    budgets = {kind: dict(limits) for kind, limits in DEFAULT_BUDGETS.items()}
+    overrides = {}
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        for key, limits in config.items():
+            if key == 'overrides':
+                overrides = limits
+            elif key in budgets:
+                budgets[key].update(limits)
+            else:
+                raise SystemExit(f'{path}: unknown budget section "{key}"')
+        for limits in [*budgets.values(), *overrides.values()]:
+            unknown = set(limits) - set(METRICS)
+            if unknown:
+                raise SystemExit(f"{path}: unknown metrics {', '.join(sorted(unknown))}")
+    return budgets, overrides
+
+
+def check(kind, item_id, measures, budgets, overrides):
+    """Return a list of overages for one item"""
+    limits = {**budgets.get(kind, {}), **overrides.get(f'{kind}:{item_id}', {})}
+    problems = []
+    for metric, limit in limits.items():
+        value = measures.get(metric)
+        if value is not None and limit is not None and value > limit:
+            problems.append(f'{kind}:{item_id}: {metric} {value} exceeds budget {limit} (+{value - limit})')
+    return problems
+
+
+def format_size(value):
+    return 'n/a' if value is None else f'{value / 1024:.1f}K'
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report content payload sizes and enforce budgets')
+    parser.add_argument('--lms', default=str(LMS_PATH))
+    parser.add_argument('--examples', default=str(EXAMPLES_PATH))
+    parser.add_argument('--budgets', help='JSON budget file overriding the built-in defaults')
+    parser.add_argument('--json', dest='json_path', help='also write the full report here')
+    parser.add_argument('-q', '--quiet', action='store_true', help='only print overages and the summary')
+    parser.add_argument('--no-brotli', action='store_true', help='skip brotli sizes and budgets')
+    args = parser.parse_args()
+
+    budgets, overrides = load_budgets(args.budgets)
+    brotli_budgeted = any(
+        limits.get('brotli') is not None for limits in [*budgets.values(), *overrides.values()]
+    )
+    if brotli is None and brotli_budgeted and not args.no_brotli:
+        sys.exit('❌ brotli budgets are set but the brotli package is not installed; '
+                 '`pip install brotli`, or pass --no-brotli to skip them')
+
+    report = []
+    problems = []
+    for kind, item_id, measures in measure_content(load_json(args.lms), load_json(args.examples), not args.no_brotli):
+        issues = check(kind, item_id, measures, budgets, overrides)
+        problems += issues
+        report.append({'kind': kind, 'id': item_id, **measures, 'over_budget': bool(issues)})
+
+    if not args.quiet:
+        print(f"{'item':<40} {'raw':>8} {'gzip':>8} {'brotli':>8} {'math':>6} {'comp':>5}")
+        for row in report:
+            flag = ' ❌' if row['over_budget'] else ''
+            print(f"{row['kind'] + ':' + row['id']:<40} {format_size(row['raw']):>8} {format_size(row['gzip']):>8} "
+                  f"{format_size(row['brotli']):>8} {row['math']:>6} {row['components']:>5}{flag}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'budgets': budgets, 'overrides': overrides, 'items': report}, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+
+    for problem in problems:
+        print(f'  ❌ {problem}', file=sys.stderr)
+    lessons = [row for row in report if row['kind'] == 'lesson']
+    print(f"{'❌' if problems else '✅'} {len(lessons)} lessons, "
+          f"{format_size(sum(row['gzip'] for row in lessons))} gzipped in total, {len(problems)} over budget")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
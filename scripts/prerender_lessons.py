@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Build-time prerender of lesson markdown for Markov Learning Lab
+- Renders each published lesson in data/lms.json to a sanitized HTML fragment
+- Math ($inline$, $$display$$ and ```math fences) is left as marked placeholders
+  (<span|div class="math math-inline|math-display">) holding the escaped TeX, ready for KaTeX
+- component/chart/video/solution fences become mount points carrying their config,
+  so components/markdown-renderer.tsx widgets can hydrate in place
+- Heading ids are slugged from each rendered heading's own text with the renderer's rules
+  and repeat suffixes, so TOC anchors keep working
+- Fragments are cached by content hash; only changed lessons are re-rendered
+- Requires Markdown (python-markdown)
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import re
+import secrets
+from html.parser import HTMLParser
+from pathlib import Path
+
+import markdown
+
+from component_manifest import parse_component_config
+from payload_budget import CODE_SPAN_RE, MATH_RE, split_fences
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LMS_PATH = REPO_ROOT / 'data' / 'lms.json'
+OUTPUT_DIR = REPO_ROOT / 'public' / 'prerendered' / 'lessons'
+
+# Bump when the HTML this script produces changes, so cached fragments are rebuilt
+RENDER_VERSION = 3
+
+MARKDOWN_EXTENSIONS = ['fenced_code', 'tables', 'sane_lists']
+# Fenced blocks the client renders as widgets (see the `code` override in markdown-renderer.tsx)
+MOUNT_LANGS = {'component', 'Component', 'chart', 'video', 'solution'}
+
+HEADING_RE = re.compile(r'h[1-6]')
+LIST_ITEM_RE = re.compile(r'^( *)(?:[-*+]|\d+[.)])\s')
+
+# Close to the rehype-sanitize schema the renderer builds: GitHub defaults plus div and https iframes
+ALLOWED_TAGS = {
+    'a', 'blockquote', 'br', 'code', 'del', 'div', 'em', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'hr', 'iframe', 'img', 'li', 'ol', 'p', 'pre', 'span', 'strong', 'sub', 'sup',
+    'table', 'tbody', 'td', 'th', 'thead', 'tr', 'ul',
+}
+VOID_TAGS = {'br', 'hr', 'img'}
+DROP_CONTENT_TAGS = {'script', 'style', 'template', 'noscript'}
+ALLOWED_ATTRS = {
+    'a': {'href', 'title'},
+    'img': {'src', 'alt', 'title', 'width', 'height'},
+    'iframe': {'src', 'width', 'height', 'allow', 'allowfullscreen', 'frameborder', 'title'},
+    'code': {'class'},
+    'div': {'class'},
+    'span': {'class'},
+    # Table alignment is the only inline style markdown produces
+    'th': {'align', 'style'},
+    'td': {'align', 'style'},
+    'ol': {'start'},
+    'h1': {'id'}, 'h2': {'id'}, 'h3': {'id'}, 'h4': {'id'}, 'h5': {'id'}, 'h6': {'id'},
+}
+URL_ATTRS = {'href', 'src'}
+SAFE_URL_RE = re.compile(r'^(https?:|mailto:|#|/|\./|\.\./|[^:/?#]*(?:[/?#]|$))', re.IGNORECASE)
+
+
+def slugify(text):
+    """The renderer's heading slug: lower, strip tags and non-word chars, spaces to dashes"""
+    text = text.lower().strip()
+    text = re.sub(r'</?[^>]+(>|$)', '', text)
+    text = re.sub(r'[^\w\s-]', '', text, flags=re.ASCII)
+    return re.sub(r'\s+', '-', text, flags=re.ASCII)
+
+
+def gfm_lists(text):
+    """
+    Adapt GFM lists to python-markdown: a list may interrupt a paragraph without a
+    blank line, and nested items may be indented by fewer than four spaces
+    """
+    out = []
+    indents = []
+    previous = ''
+    for line in text.split('\n'):
+        item = LIST_ITEM_RE.match(line)
+        if item:
+            indent = len(item.group(1))
+            if previous.strip() and not LIST_ITEM_RE.match(previous):
+                out.append('')
+            while indents and indents[-1] > indent:
+                indents.pop()
+            if not indents or indents[-1] < indent:
+                indents.append(indent)
+            line = '    ' * (len(indents) - 1) + line.lstrip(' ')
+        elif line.strip() and not line.startswith(' '):
+            indents = []
+        out.append(line)
+        previous = line
+    return '\n'.join(out)
+
+
+class Extractor:
+    """Swaps math and widget fences for opaque tokens that survive markdown rendering"""
+
+    def __init__(self):
+        self.fragments = []
+        # Plain text of each token, used when a heading's id is computed from its text
+        self.texts = []
+        self.math = []
+        self.mounts = []
+        # A per-run nonce, so author text can never spell a live token
+        self.nonce = secrets.token_hex(8)
+        self.token_re = re.compile(rf'MLL{self.nonce}T(\d+)X')
+
+    def token(self, fragment, text=''):
+        self.fragments.append(fragment)
+        self.texts.append(text)
+        return f'MLL{self.nonce}T{len(self.fragments) - 1}X'
+
+    def expand(self, text, plain=False):
+        """Swap tokens back for their fragments (or, with plain, for the source TeX)"""
+        def fragment(match):
+            i = int(match.group(1))
+            return self.texts[i] if plain else self.fragments[i]
+        return self.token_re.sub(fragment, text)
+
+    def math_token(self, tex, display):
+        self.math.append({'tex': tex, 'display': display})
+        kind = 'display' if display else 'inline'
+        tag = 'div' if display else 'span'
+        token = self.token(f'<{tag} class="math math-{kind}">{html.escape(tex, quote=False)}</{tag}>', tex)
+        # Display math stands alone so markdown gives it its own paragraph
+        return f'\n\n{token}\n\n' if display else token
+
+    def mount_token(self, lang, raw):
+        lang = lang.lower()
+        if lang == 'component':
+            cfg = parse_component_config(raw)
+            if cfg is None:
+                attrs = f'data-mount="component" data-config="{html.escape(raw)}"'
+            else:
+                props = json.dumps(cfg['props'], ensure_ascii=False, separators=(',', ':'))
+                attrs = f'data-mount="component" data-component="{html.escape(cfg["name"])}" data-props="{html.escape(props)}"'
+                self.mounts.append(cfg['name'])
+        else:
+            attrs = f'data-mount="{lang}" data-config="{html.escape(raw)}"'
+            self.mounts.append(lang)
+        return f'\n\n{self.token(f"<div {attrs}></div>")}\n\n'
+
+    def replace_math(self, segment):
+        # Find math in a copy with code spans blanked, then splice into the original
+        blanked = CODE_SPAN_RE.sub(lambda m: ' ' * len(m.group()), segment)
+        out = []
+        pos = 0
+        for match in MATH_RE.finditer(blanked):
+            display = match.group(1) is not None
+            out.append(segment[pos:match.start()])
+            out.append(self.math_token((match.group(1) if display else match.group(2)).strip(), display))
+            pos = match.end()
+        out.append(segment[pos:])
+        return ''.join(out)
+
+    def prepare(self, markdown_text):
+        """Markdown with math and widget fences replaced by tokens; code fences untouched"""
+        out = []
+        for lang, text in split_fences(markdown_text):
+            if lang is None:
+                out.append(self.replace_math(gfm_lists(text)))
+            elif lang == 'math':
+                out.append(self.math_token(text.strip(), True))
+            elif lang in MOUNT_LANGS:
+                out.append(self.mount_token(lang, text))
+            else:
+                fence = '~~~~' if '```' in text else '```'
+                out.append(f'{fence}{lang}\n{text}\n{fence}')
+        return '\n'.join(out)
+
+
+class Sanitizer(HTMLParser):
+    """
+    Re-serializes HTML keeping only allowlisted tags, attributes and URL schemes.
+    Each heading gets its id from its own text, with the renderer's count suffix for repeats.
+    """
+
+    def __init__(self, extractor):
+        super().__init__(convert_charrefs=False)
+        self.out = []
+        self.extractor = extractor
+        self.dropping = 0
+        self.ids = []
+        self.id_counts = {}
+        # (index of the open tag in out, tag, attrs, text so far) while inside a heading
+        self.heading = None
+
+    def clean_attrs(self, tag, attrs):
+        allowed = ALLOWED_ATTRS.get(tag, set())
+        kept = []
+        for name, value in attrs:
+            if name not in allowed:
+                continue
+            value = value or ''
+            if name in URL_ATTRS:
+                url = value.strip()
+                if not SAFE_URL_RE.match(url) or (tag == 'iframe' and not url.lower().startswith('https:')):
+                    continue
+            kept.append(f' {name}="{html.escape(value)}"' if value or name != 'allowfullscreen' else f' {name}')
+        return ''.join(kept)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping += 1
+            return
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+        if HEADING_RE.fullmatch(tag) and self.heading is None:
+            # The id is known once the heading's text is; the tag is written at its end
+            self.heading = (len(self.out), tag, [(n, v) for n, v in attrs if n != 'id'], [])
+            self.out.append('')
+            return
+        self.out.append(f'<{tag}{self.clean_attrs(tag, attrs)}>')
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping = max(0, self.dropping - 1)
+            return
+        if self.heading and tag == self.heading[1]:
+            self.close_heading()
+        if not self.dropping and tag in ALLOWED_TAGS and tag not in VOID_TAGS:
+            self.out.append(f'</{tag}>')
+
+    def close_heading(self):
+        index, tag, attrs, text = self.heading
+        self.heading = None
+        base = slugify(self.extractor.expand(''.join(text), plain=True))
+        count = self.id_counts.get(base, 0)
+        self.id_counts[base] = count + 1
+        heading_id = f'{base}-{count}' if count else base
+        self.ids.append(heading_id)
+        self.out[index] = f"<{tag}{self.clean_attrs(tag, attrs + [('id', heading_id)])}>"
+
+    def heading_text(self, text):
+        if self.heading:
+            self.heading[3].append(text)
+
+    def handle_data(self, data):
+        if not self.dropping:
+            self.heading_text(data)
+            self.out.append(html.escape(data, quote=False))
+
+    def handle_entityref(self, name):
+        if not self.dropping:
+            self.heading_text(html.unescape(f'&{name};'))
+            self.out.append(f'&{name};')
+
+    def handle_charref(self, name):
+        if not self.dropping:
+            self.heading_text(html.unescape(f'&#{name};'))
+            self.out.append(f'&#{name};')
+
+    def close(self):
+        super().close()
+        if self.heading:
+            self.close_heading()
+
+
+def sanitize(fragment, extractor):
+    """Sanitized HTML and the heading ids it was given, in document order"""
+    parser = Sanitizer(extractor)
+    parser.feed(fragment)
+    parser.close()
+    return ''.join(parser.out), parser.ids
+
+
+def render_lesson(content):
+    """Return (html, math expressions, mounted widgets, toc ids) for one lesson body"""
+    extractor = Extractor()
+    prepared = extractor.prepare(content)
+    rendered = markdown.markdown(prepared, extensions=MARKDOWN_EXTENSIONS, output_format='html')
+    cleaned, ids = sanitize(rendered, extractor)
+    # Tokens are swapped in after sanitizing: their markup is generated here, never by authors
+    # Block tokens (display math, mounts) are unwrapped from the paragraph markdown gave them
+    cleaned = re.sub(
+        rf'<p>\s*({extractor.token_re.pattern})\s*</p>',
+        lambda m: m.group(1) if extractor.fragments[int(m.group(2))].startswith('<div') else m.group(0),
+        cleaned,
+    )
+    cleaned = extractor.expand(cleaned)
+    return cleaned, extractor.math, extractor.mounts, ids
+
+
+def lesson_hash(lesson):
+    payload = json.dumps(
+        {'version': RENDER_VERSION, 'id': lesson['id'], 'content': lesson.get('content') or ''},
+        ensure_ascii=False, sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def load_index(path):
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {'version': RENDER_VERSION, 'lessons': {}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prerender published lessons to sanitized HTML fragments')
+    parser.add_argument('--lms', default=str(LMS_PATH))
+    parser.add_argument('-o', '--output-dir', default=str(OUTPUT_DIR))
+    parser.add_argument('--all', action='store_true', help='include draft lessons')
+    parser.add_argument('--force', action='store_true', help='ignore the cache and re-render everything')
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    index_path = output_dir / 'index.json'
+    index = {'version': RENDER_VERSION, 'lessons': {}} if args.force else load_index(index_path)
+
+    with open(args.lms, 'r', encoding='utf-8') as f:
+        lessons = json.load(f)['lessons']
+    lessons = [l for l in lessons if args.all or l.get('status') == 'published']
+
+    rendered = 0
+    entries = {}
+    for lesson in lessons:
+        digest = lesson_hash(lesson)
+        cached = index['lessons'].get(lesson['id'])
+        fragment_path = output_dir / f"{lesson['id']}.html"
+        if cached and cached['hash'] == digest and fragment_path.exists():
+            entries[lesson['id']] = cached
+            continue
+        fragment, math, mounts, ids = render_lesson(lesson.get('content') or '')
+        fragment_path.write_text(fragment + '\n', encoding='utf-8')
+        entries[lesson['id']] = {
+            'hash': digest,
+            'file': fragment_path.name,
+            'bytes': len(fragment.encode('utf-8')),
+            'math': len(math),
+            'displayMath': sum(1 for m in math if m['display']),
+            'mounts': sorted(set(mounts)),
+            'headings': ids,
+        }
+        rendered += 1
+        print(f"  ✏️  {lesson['id']}: {len(math)} math, {len(mounts)} mounts")
+
+    # Drop fragments for lessons that were removed or unpublished
+    for stale in set(index['lessons']) - set(entries):
+        (output_dir / index['lessons'][stale]['file']).unlink(missing_ok=True)
+
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': RENDER_VERSION, 'lessons': entries}, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    print(f'✅ {rendered} rendered, {len(entries) - rendered} cached → {output_dir}')
+
+
+if __name__ == '__main__':
+    main()
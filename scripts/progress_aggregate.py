@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Streaming aggregator for user_progress and user_designs table dumps
+- Reads JSONL or CSV exports (optionally .gz) one row at a time; memory is bounded by
+  the number of lessons and histogram buckets, not by the number of rows
+- user_progress.progress_data (ProgressData in lib/progress-sync.ts): per-lesson visit and
+  completion counts, and drop-off between consecutive lessons in curriculum order
+  (courses as listed in data/lms.json, lessons by `order`)
+- user_designs.chain_data (MarkovChain in lib/server/design-store.ts): size histograms and
+  structural statistics across all saved designs
+- Lesson ids are interned to array indices; all counters are typed arrays
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import sys
+from array import array
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LMS_PATH = REPO_ROOT / 'data' / 'lms.json'
+
+# Histogram buckets 0..HISTOGRAM_CAP-1; larger values share the last bucket
+HISTOGRAM_CAP = 64
+ROW_SUM_TOLERANCE = 1e-6
+
+
+def open_dump(path):
+    raw = gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+    return io.TextIOWrapper(raw, encoding='utf-8', newline='')
+
+
+def iter_rows(path):
+    """Yield row dicts from a .jsonl or .csv dump; JSONB columns may be objects or JSON text"""
+    base = path[:-3] if path.endswith('.gz') else path
+    with open_dump(path) as f:
+        if base.endswith('.csv'):
+            # JSONB cells easily exceed the default 128 KiB field limit
+            csv.field_size_limit(sys.maxsize)
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def jsonb(value):
+    if isinstance(value, str):
+        return json.loads(value) if value else None
+    return value
+
+
+def curriculum(lms):
+    """Lesson ids in curriculum order: courses as listed, lessons by `order` within each"""
+    course_rank = {course['id']: i for i, course in enumerate(lms['courses'])}
+    lessons = sorted(
+        lms['lessons'],
+        key=lambda l: (course_rank.get(l['courseId'], len(course_rank)), l.get('order') or 0),
+    )
+    return [(lesson['id'], lesson['courseId']) for lesson in lessons]
+
+
+class ProgressAggregator:
+    """Per-lesson counters over ProgressData blobs"""
+
+    def __init__(self, lessons):
+        self.ids = [lesson_id for lesson_id, _ in lessons]
+        self.courses = [course_id for _, course_id in lessons]
+        self.index = {lesson_id: i for i, lesson_id in enumerate(self.ids)}
+        self.known = len(self.ids)
+        n = self.known
+        self.visited = array('Q', bytes(8 * n))
+        self.completed = array('Q', bytes(8 * n))
+        # completed_next[i]: users who completed lesson i and lesson i + 1
+        self.completed_next = array('Q', bytes(8 * max(n - 1, 0)))
+        # furthest[i]: users whose last completed lesson in curriculum order is i
+        self.furthest = array('Q', bytes(8 * n))
+        self.completion_hist = array('Q', bytes(8 * (n + 1)))
+        self.users = 0
+        self.empty = 0
+        self.malformed = 0
+
+    def intern(self, lesson_id):
+        """Index of a lesson id; ids missing from lms.json get slots after the known ones"""
+        i = self.index.get(lesson_id)
+        if i is None:
+            i = len(self.ids)
+            self.index[lesson_id] = i
+            self.ids.append(lesson_id)
+            self.courses.append(None)
+            self.visited.append(0)
+            self.completed.append(0)
+        return i
+
+    def add(self, progress):
+        if not isinstance(progress, dict):
+            self.malformed += 1
+            return
+        self.users += 1
+        if not progress:
+            self.empty += 1
+        done = []
+        for lesson_id, entry in progress.items():
+            i = self.intern(lesson_id)
+            self.visited[i] += 1
+            if isinstance(entry, dict) and entry.get('completed'):
+                self.completed[i] += 1
+                if i < self.known:
+                    done.append(i)
+        done.sort()
+        for a, b in zip(done, done[1:]):
+            if b == a + 1:
+                self.completed_next[a] += 1
+        if done:
+            self.furthest[done[-1]] += 1
+        self.completion_hist[len(done)] += 1
+
+    def report(self):
+        lessons = []
+        for i in range(self.known):
+            row = {
+                'id': self.ids[i],
+                'courseId': self.courses[i],
+                'visited': self.visited[i],
+                'completed': self.completed[i],
+                'furthest': self.furthest[i],
+            }
+            if i + 1 < self.known:
+                row['next'] = self.ids[i + 1]
+                row['completedNext'] = self.completed_next[i]
+                row['dropOff'] = 1 - self.completed_next[i] / self.completed[i] if self.completed[i] else None
+            lessons.append(row)
+        return {
+            'users': self.users,
+            'emptyProgress': self.empty,
+            'malformed': self.malformed,
+            'lessons': lessons,
+            'unknownLessons': {
+                self.ids[i]: self.visited[i] for i in range(self.known, len(self.ids))
+            },
+            'completedLessonsHistogram': list(self.completion_hist),
+        }
+
+
+class DesignAggregator:
+    """Structural statistics over MarkovChain blobs"""
+
+    def __init__(self):
+        self.designs = 0
+        self.malformed = 0
+        self.state_hist = array('Q', bytes(8 * HISTOGRAM_CAP))
+        self.transition_hist = array('Q', bytes(8 * HISTOGRAM_CAP))
+        self.total_states = 0
+        self.total_transitions = 0
+        self.stochastic = 0
+        self.with_absorbing = 0
+        self.with_self_loops = 0
+        self.dangling = 0
+
+    def add(self, chain):
+        if not isinstance(chain, dict) or not isinstance(chain.get('states'), list):
+            self.malformed += 1
+            return
+        states = chain['states']
+        transitions = chain.get('transitions') or []
+        self.designs += 1
+        self.total_states += len(states)
+        self.total_transitions += len(transitions)
+        self.state_hist[min(len(states), HISTOGRAM_CAP - 1)] += 1
+        self.transition_hist[min(len(transitions), HISTOGRAM_CAP - 1)] += 1
+
+        ids = {s.get('id') for s in states}
+        out_sum = dict.fromkeys(ids, 0.0)
+        self_loop = set()
+        leaves = set()
+        dangling = False
+        for t in transitions:
+            src, dst = t.get('from'), t.get('to')
+            if src not in out_sum or dst not in out_sum:
+                dangling = True
+                continue
+            out_sum[src] += float(t.get('probability') or 0)
+            if src == dst:
+                self_loop.add(src)
+            else:
+                leaves.add(src)
+        self.dangling += dangling
+        self.with_self_loops += bool(self_loop)
+        # Absorbing: all outgoing mass is on the self-loop
+        self.with_absorbing += any(
+            abs(out_sum[s] - 1) <= ROW_SUM_TOLERANCE for s in self_loop - leaves
+        )
+        self.stochastic += bool(out_sum) and all(abs(total - 1) <= ROW_SUM_TOLERANCE for total in out_sum.values())
+
+    def report(self):
+        def trimmed(hist):
+            last = max((i for i, count in enumerate(hist) if count), default=-1)
+            return list(hist[:last + 1])
+
+        return {
+            'designs': self.designs,
+            'malformed': self.malformed,
+            'meanStates': self.total_states / self.designs if self.designs else 0,
+            'meanTransitions': self.total_transitions / self.designs if self.designs else 0,
+            'stochastic': self.stochastic,
+            'withAbsorbingState': self.with_absorbing,
+            'withSelfLoops': self.with_self_loops,
+            'danglingTransitions': self.dangling,
+            # Last bucket counts designs with HISTOGRAM_CAP - 1 or more
+            'stateHistogram': trimmed(self.state_hist),
+            'transitionHistogram': trimmed(self.transition_hist),
+        }
+
+
+def print_progress(report):
+    print(f"📈 {report['users']} users ({report['emptyProgress']} with no progress, {report['malformed']} malformed)")
+    print(f"{'lesson':<26} {'visited':>9} {'completed':>10} {'→ next':>9} {'drop-off':>9}")
+    for row in report['lessons']:
+        drop = row.get('dropOff')
+        print(f"{row['id']:<26} {row['visited']:>9} {row['completed']:>10} "
+              f"{row.get('completedNext', ''):>9} {'' if drop is None else f'{drop:.1%}':>9}")
+    for lesson_id, count in report['unknownLessons'].items():
+        print(f'  ⚠️  {lesson_id} is not in lms.json ({count} users)')
+
+
+def print_designs(report):
+    print(f"🧩 {report['designs']} designs ({report['malformed']} malformed), "
+          f"{report['meanStates']:.1f} states and {report['meanTransitions']:.1f} transitions on average")
+    print(f"   {report['stochastic']} row-stochastic, {report['withAbsorbingState']} with an absorbing state, "
+          f"{report['withSelfLoops']} with self-loops, {report['danglingTransitions']} with dangling transitions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Aggregate user_progress / user_designs dumps')
+    parser.add_argument('inputs', nargs='+', help='.jsonl or .csv dumps (optionally .gz) of either table')
+    parser.add_argument('--lms', default=str(LMS_PATH))
+    parser.add_argument('--json', dest='json_path', help='also write the full report here')
+    args = parser.parse_args()
+
+    with open(args.lms, 'r', encoding='utf-8') as f:
+        progress = ProgressAggregator(curriculum(json.load(f)))
+    designs = DesignAggregator()
+
+    rows = 0
+    for path in args.inputs:
+        for row in iter_rows(path):
+            rows += 1
+            if 'progress_data' in row:
+                try:
+                    progress.add(jsonb(row['progress_data']))
+                except ValueError:
+                    progress.malformed += 1
+            elif 'chain_data' in row:
+                try:
+                    designs.add(jsonb(row['chain_data']))
+                except ValueError:
+                    designs.malformed += 1
+            else:
+                sys.exit(f'❌ {path}: rows need a progress_data or chain_data column')
+            if rows % 1_000_000 == 0:
+                print(f'  … {rows} rows', file=sys.stderr)
+
+    report = {}
+    if progress.users or progress.malformed:
+        report['progress'] = progress.report()
+        print_progress(report['progress'])
+    if designs.designs or designs.malformed:
+        report['designs'] = designs.report()
+        print_designs(report['designs'])
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+    print(f'✅ Aggregated {rows} rows from {len(args.inputs)} files', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
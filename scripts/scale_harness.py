@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Scale-test harness for Markov chain analysis and simulation
+- Generates valid synthetic designs (rows sum to 1) in the data/examples.json `design`
+  schema: random sparse, banded, block-diagonal, periodic and absorbing chains
+- For each family and size (10 to 10^6 states by default) times: design → matrix
+  construction, stationary solve, communicating classes + periodicity, and simulation
+- Fits t ≈ c · f(n) for f in {1, log n, n, n log n, n^2} per stage and reports the best
+  model, the log-log slope and the largest chain each stage handles within a time budget
+- The stationary solve is fitted per power iteration (iteration counts vary by family and
+  size and are reported separately); simulation runs one walker per state by default, so
+  its work grows with n
+- Stages that blow the per-stage budget are skipped for the larger sizes of that family
+- Requires NumPy
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from chain_analysis import (
+    CSRMatrix,
+    build_transition_matrix,
+    class_periods,
+    communicating_classes,
+    simulate,
+    stationary_distribution,
+)
+from ngram_trainer import PALETTE
+
+DEFAULT_SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+STAGES = ('matrix', 'stationary', 'classes', 'simulate')
+MODELS = {
+    '1': lambda n: np.ones_like(n, dtype=float),
+    'log n': lambda n: np.log2(n),
+    'n': lambda n: n,
+    'n log n': lambda n: n * np.log2(n),
+    'n^2': lambda n: n ** 2,
+}
+
+
+def normalize(n, rows, cols, weights):
+    """Scale positive weights so every row sums to 1"""
+    totals = np.bincount(rows, weights=weights, minlength=n)
+    return rows, cols, weights / totals[rows]
+
+
+def sparse_chain(n, rng, degree=4):
+    """Random out-edges per state plus a ring i → i+1, so the chain is irreducible"""
+    d = min(degree, n)
+    rows = np.concatenate([np.repeat(np.arange(n), d), np.arange(n)])
+    cols = np.concatenate([rng.integers(0, n, size=n * d), (np.arange(n) + 1) % n])
+    return normalize(n, rows, cols, rng.random(len(rows)) + 0.05)
+
+
+def banded_chain(n, rng, bandwidth=2):
+    """Edges to the neighbours within `bandwidth` (wrapping), like a birth–death process"""
+    offsets = np.arange(-bandwidth, bandwidth + 1)
+    rows = np.repeat(np.arange(n), len(offsets))
+    cols = (rows + np.tile(offsets, n)) % n
+    return normalize(n, rows, cols, rng.random(len(rows)) + 0.05)
+
+
+def block_chain(n, rng, block=50, degree=4):
+    """Independent dense-ish blocks: one closed communicating class per block"""
+    rows = np.repeat(np.arange(n), degree)
+    start = (rows // block) * block
+    size = np.minimum(block, n - start)
+    cols = start + (rng.integers(0, block, size=len(rows)) % size)
+    return normalize(n, rows, cols, rng.random(len(rows)) + 0.05)
+
+
+def periodic_chain(n, rng, degree=3):
+    """States in p layers (p = 5 when it divides n); edges only go to the next layer"""
+    p = next(k for k in (5, 4, 3, 2, 1) if n % k == 0)
+    rows = np.repeat(np.arange(n), degree)
+    jumps = p * rng.integers(0, max(n // p, 1), size=len(rows))
+    cols = (rows + 1 + jumps) % n
+    # The ring keeps the chain irreducible; its step also lands on the next layer
+    rows = np.concatenate([rows, np.arange(n)])
+    cols = np.concatenate([cols, (np.arange(n) + 1) % n])
+    return normalize(n, rows, cols, rng.random(len(rows)) + 0.05)
+
+
+def absorbing_chain(n, rng, degree=4):
+    """About 1% absorbing states (self-loop 1); every transient state leaks into one of them"""
+    a = max(1, n // 100)
+    transient = n - a
+    rows = np.repeat(np.arange(transient), degree + 1)
+    cols = rng.integers(0, n, size=len(rows))
+    cols[degree::degree + 1] = transient + rng.integers(0, a, size=transient)
+    rows = np.concatenate([rows, np.arange(transient, n)])
+    cols = np.concatenate([cols, np.arange(transient, n)])
+    return normalize(n, rows, cols, rng.random(len(rows)) + 0.05)
+
+
+GENERATORS = {
+    'sparse': sparse_chain,
+    'banded': banded_chain,
+    'block': block_chain,
+    'periodic': periodic_chain,
+    'absorbing': absorbing_chain,
+}
+
+
+def to_design(n, rows, cols, probs):
+    """Edge arrays as an examples.json `design` (grid layout, palette colors)"""
+    grid = max(1, math.ceil(math.sqrt(n)))
+    states = [
+        {'id': f's{i}', 'name': f'S{i}', 'x': 300 + (i % grid) * 250, 'y': 300 + (i // grid) * 250,
+         'color': PALETTE[i % len(PALETTE)]}
+        for i in range(n)
+    ]
+    transitions = [
+        {'id': f's{i}-s{j}-{k}', 'from': f's{i}', 'to': f's{j}', 'probability': p}
+        for k, (i, j, p) in enumerate(zip(rows.tolist(), cols.tolist(), probs.tolist()))
+    ]
+    return {'states': states, 'transitions': transitions}
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def run_size(family, n, rng, args):
+    """Time every stage that is still within budget for this family; returns {stage: seconds}"""
+    rows, cols, probs = GENERATORS[family](n, rng)
+    timings = {}
+    if n <= args.design_limit:
+        design = to_design(n, rows, cols, probs)
+        timings['matrix'], matrix = timed(build_transition_matrix, design['states'], design['transitions'])
+        if args.fixtures:
+            path = Path(args.fixtures) / f'{family}-{n}.json'
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'id': f'{family}-{n}', 'title': f'Synthetic {family} chain ({n} states)', 'design': design}, f)
+        del design
+    else:
+        # Too large for per-state dicts; time construction from the edge arrays instead
+        timings['matrix'], matrix = timed(CSRMatrix.from_edges, n, rows, cols, probs)
+
+    timings['stationary'], (_, converged, iterations) = timed(
+        stationary_distribution, matrix, 1e-6, args.max_iterations)
+
+    def classes_and_periods():
+        graph = matrix.positive()
+        classes, comp = communicating_classes(graph)
+        return classes, class_periods(graph, classes, comp)
+
+    timings['classes'], (classes, periods) = timed(classes_and_periods)
+    walkers = max(1, round(args.walkers_per_state * n))
+    timings['simulate'], _ = timed(simulate, matrix, rng.integers(0, n, size=walkers), args.steps, rng)
+    details = {
+        'transitions': int(len(matrix.data)),
+        'converged': converged,
+        'iterations': iterations,
+        'walkers': walkers,
+        'classes': len(classes),
+        'period': max(periods) if periods else 0,
+        'matrixFrom': 'design' if n <= args.design_limit else 'edges',
+    }
+    return timings, details
+
+
+def stage_points(rows, stage):
+    """(n, seconds) to fit for a stage; the stationary solve is taken per iteration"""
+    points = []
+    for row in rows:
+        seconds = row['seconds'][stage]
+        if stage == 'matrix' and row['matrixFrom'] != 'design':
+            # Matrix times from edge arrays measure a different path; only design-built ones are fitted
+            continue
+        if stage == 'stationary':
+            seconds /= max(row['iterations'], 1)
+        points.append((row['states'], seconds))
+    return points
+
+
+def fit(points, fit_from):
+    """Best of MODELS for (n, seconds) points with n >= fit_from, by log-space residual; plus the log-log slope"""
+    points = [(n, t) for n, t in points if n >= fit_from and t > 1e-4]
+    if len(points) < 2:
+        return None
+    ns = np.array([n for n, _ in points], dtype=float)
+    ts = np.array([t for _, t in points])
+    slope = float(np.polyfit(np.log(ns), np.log(ts), 1)[0])
+    best = None
+    for name, model in MODELS.items():
+        log_c = np.mean(np.log(ts) - np.log(model(ns)))
+        residual = float(np.mean((np.log(ts) - np.log(model(ns)) - log_c) ** 2))
+        if best is None or residual < best['residual']:
+            best = {'model': name, 'constant': float(np.exp(log_c)), 'residual': residual}
+    best['slope'] = slope
+    return best
+
+
+def max_size_within(model, constant, budget):
+    """Largest n with constant · model(n) <= budget (doubling then bisection); None if it never binds"""
+    if model in ('1', 'log n'):
+        return None
+    f = MODELS[model]
+    low, high = 1, 2
+    while constant * f(high) <= budget and high < 10 ** 12:
+        low, high = high, high * 2
+    while high - low > 1:
+        mid = (low + high) // 2
+        low, high = (mid, high) if constant * f(mid) <= budget else (low, mid)
+    return low
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time chain analysis and simulation on synthetic designs')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--families', nargs='+', choices=sorted(GENERATORS), default=list(GENERATORS))
+    parser.add_argument('--max-iterations', type=int, default=1000, help='power-iteration cap, as in the app')
+    parser.add_argument('--walkers-per-state', type=float, default=1.0,
+                        help='simulated walkers per state, so simulation work scales with n')
+    parser.add_argument('--steps', type=int, default=100)
+    parser.add_argument('--design-limit', type=int, default=100_000,
+                        help='largest size built through the design schema (beyond it, from edge arrays)')
+    parser.add_argument('--stage-budget', type=float, default=60.0,
+                        help='once any stage of a family takes longer than this (s), larger sizes of it are skipped')
+    parser.add_argument('--fit-from', type=int, default=1000, help='smallest size used for curve fitting')
+    parser.add_argument('--target', type=float, default=1.0, help='seconds used to report the largest safe chain')
+    parser.add_argument('--fixtures', help='also write each generated design (up to --design-limit) here')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help='write the JSON scaling report here')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    results = {family: [] for family in args.families}
+    print(f"{'family':<10} {'states':>9} {'edges':>9} " + ' '.join(f'{s:>11}' for s in STAGES) + '  notes')
+    for family in args.families:
+        for n in sorted(args.sizes):
+            timings, details = run_size(family, n, rng, args)
+            results[family].append({'states': n, **details, 'seconds': timings})
+            notes = f"{details['classes']} classes, period {details['period']}, " + (
+                f"converged in {details['iterations']}" if details['converged'] else 'did not converge')
+            print(f"{family:<10} {n:>9} {details['transitions']:>9} "
+                  + ' '.join(f'{timings[s]:>10.4f}s' for s in STAGES) + f'  {notes}', flush=True)
+            if max(timings.values()) > args.stage_budget:
+                print(f'  ⚠️  {family}: over the {args.stage_budget:g}s stage budget at {n} states; skipping larger sizes',
+                      file=sys.stderr)
+                break
+
+    fits = {}
+    print(f"\n{'family':<10} {'stage':<16} {'model':>8} {'slope':>6}  max states in {args.target:g}s")
+    for family, rows in results.items():
+        fits[family] = {}
+        for stage in STAGES:
+            best = fit(stage_points(rows, stage), args.fit_from)
+            if best is None:
+                continue
+            budget = args.target
+            if stage == 'stationary':
+                # Per-iteration fit; budget for the most iterations this family needed
+                best['perIteration'] = True
+                budget /= max(max(row['iterations'] for row in rows), 1)
+            best['maxStatesWithinTarget'] = max_size_within(best['model'], best['constant'], budget)
+            fits[family][stage] = best
+            limit = best['maxStatesWithinTarget']
+            label = 'stationary/iter' if stage == 'stationary' else stage
+            print(f"{family:<10} {label:<16} {best['model']:>8} {best['slope']:>6.2f}  "
+                  + ('not the bottleneck' if limit is None else f'{limit:,}'))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'settings': vars(args), 'results': results, 'fits': fits}, f, indent=2)
+            f.write('\n')
+
+
+if __name__ == '__main__':
+    main()
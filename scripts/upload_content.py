@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Bulk content uploader for Markov Learning Lab deployments
+- Diffs local data/lms.json against the server's /api/admin/content/export by content hash
+- Uploads only changed courses and lessons through /api/admin/content/import-single
+  (or in batches through /api/admin/content/import with --bulk)
+- One keep-alive connection pool, bounded concurrency, retries with exponential backoff
+- Appends each success to a checkpoint file, keyed by deployment, so an interrupted run
+  resumes where it stopped; a clean run clears its entries, leaving the server export as
+  the source of truth
+- scripts/content_standin.py serves the same routes in memory for local runs
+- Requires aiohttp
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+import aiohttp
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LMS_PATH = REPO_ROOT / 'data' / 'lms.json'
+
+# Fields the import routes persist; timestamps are left out so a re-export hashes the same
+COURSE_FIELDS = ('id', 'title', 'description', 'slug', 'status')
+LESSON_FIELDS = ('id', 'courseId', 'title', 'description', 'content', 'status', 'order')
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class UploadError(Exception):
+    """Upload failed permanently (4xx, or retries exhausted)"""
+
+
+def content_hash(item, fields):
+    payload = {field: item.get(field) for field in fields}
+    if 'order' in payload:
+        # import routes store `lesson.order || 0`
+        payload['order'] = payload['order'] or 0
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def hash_index(data):
+    """Map 'course:<id>' / 'lesson:<id>' to content hashes"""
+    index = {}
+    for course in data.get('courses', []):
+        index[f"course:{course['id']}"] = content_hash(course, COURSE_FIELDS)
+    for lesson in data.get('lessons', []):
+        index[f"lesson:{lesson['id']}"] = content_hash(lesson, LESSON_FIELDS)
+    return index
+
+
+def read_checkpoint(path):
+    entries = []
+    if path and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entries.append(json.loads(line))
+    return entries
+
+
+def load_checkpoint(path, target):
+    """Hashes checkpointed for one deployment; later lines win"""
+    return {entry['key']: entry['hash'] for entry in read_checkpoint(path) if entry.get('target') == target}
+
+
+def clear_checkpoint(path, target):
+    """Drop one deployment's entries after a clean run; the file goes once it is empty"""
+    rest = [entry for entry in read_checkpoint(path) if entry.get('target') != target]
+    if not rest:
+        if path and os.path.exists(path):
+            os.remove(path)
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        for entry in rest:
+            f.write(json.dumps(entry) + '\n')
+
+
+def plan_uploads(local, remote_index, checkpoint):
+    """Return (courses, lessons) whose hash differs from both the server and the checkpoint"""
+    def pending(kind, items, fields):
+        out = []
+        for item in items:
+            key = f"{kind}:{item['id']}"
+            digest = content_hash(item, fields)
+            if remote_index.get(key) != digest and checkpoint.get(key) != digest:
+                out.append((key, digest, item))
+        return out
+
+    return (
+        pending('course', local.get('courses', []), COURSE_FIELDS),
+        pending('lesson', local.get('lessons', []), LESSON_FIELDS),
+    )
+
+
+class ContentUploader:
+    """Shares one aiohttp session (keep-alive pool) across all uploads"""
+
+    def __init__(self, base_url, cookie=None, concurrency=8, retries=5, backoff=0.5, timeout=60, checkpoint=None):
+        self.base_url = base_url.rstrip('/')
+        self.headers = {'Cookie': cookie} if cookie else {}
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.checkpoint_path = checkpoint
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.session = None
+        self.checkpoint_file = None
+        self.uploaded = 0
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+        self.session = aiohttp.ClientSession(connector=connector, headers=self.headers, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+        if self.checkpoint_file:
+            self.checkpoint_file.close()
+
+    async def request(self, method, path, make_data=None, json_body=None):
+        """Send one request with retries; `make_data` rebuilds multipart bodies per attempt"""
+        url = f'{self.base_url}{path}'
+        for attempt in range(self.retries + 1):
+            try:
+                data = make_data() if make_data else None
+                async with self.semaphore:
+                    async with self.session.request(method, url, data=data, json=json_body) as response:
+                        text = await response.text()
+                        if response.status < 400:
+                            try:
+                                return json.loads(text) if text else {}
+                            except ValueError:
+                                raise UploadError(f'{method} {path}: expected JSON, got {text[:200]!r}')
+                        if response.status not in RETRY_STATUSES:
+                            raise UploadError(f'{method} {path}: HTTP {response.status}: {text[:200]}')
+                        error = f'HTTP {response.status}'
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = f'{type(e).__name__}: {e}'
+            if attempt == self.retries:
+                raise UploadError(f'{method} {path}: giving up after {attempt + 1} attempts ({error})')
+            await asyncio.sleep(self.backoff * (2 ** attempt) * (1 + random.random()))
+
+    async def export(self):
+        return await self.request('GET', '/api/admin/content/export')
+
+    def record(self, key, digest):
+        self.uploaded += 1
+        if self.checkpoint_path:
+            if self.checkpoint_file is None:
+                self.checkpoint_file = open(self.checkpoint_path, 'a', encoding='utf-8')
+            self.checkpoint_file.write(json.dumps({'target': self.base_url, 'key': key, 'hash': digest}) + '\n')
+            self.checkpoint_file.flush()
+
+    async def upload_single(self, key, digest, item):
+        kind = key.split(':', 1)[0]
+
+        def make_data():
+            form = aiohttp.FormData()
+            form.add_field('type', kind)
+            if kind == 'lesson':
+                form.add_field('courseId', item['courseId'])
+            form.add_field(
+                'file',
+                json.dumps(item, ensure_ascii=False).encode('utf-8'),
+                filename=f"{item['id']}.json",
+                content_type='application/json',
+            )
+            return form
+
+        result = await self.request('POST', '/api/admin/content/import-single', make_data=make_data)
+        errors = (result.get('data') or {}).get('errors') or []
+        if not result.get('success') or errors:
+            raise UploadError(f"{key}: {result.get('error') or '; '.join(errors)}")
+        self.record(key, digest)
+
+    async def upload_batch(self, batch):
+        """Send a batch through /import with every item flagged for overwrite"""
+        courses = [item for key, _, item in batch if key.startswith('course:')]
+        lessons = [item for key, _, item in batch if key.startswith('lesson:')]
+        body = {
+            'courses': courses,
+            'lessons': lessons,
+            'options': {
+                'overwriteCourses': {c['id']: True for c in courses},
+                'overwriteLessons': {l['id']: True for l in lessons},
+            },
+        }
+        result = await self.request('POST', '/api/admin/content/import', json_body=body)
+        if not result.get('success'):
+            raise UploadError(f"batch of {len(batch)}: {result.get('error')}")
+        data = result.get('data') or {}
+        failed = {
+            message.split(':', 1)[0]
+            for section in ('courses', 'lessons')
+            for message in (data.get(section) or {}).get('errors') or []
+        }
+        for key, digest, item in batch:
+            label = f"{key.split(':', 1)[0].capitalize()} {item['id']}"
+            if label not in failed:
+                self.record(key, digest)
+        if failed:
+            raise UploadError(f"batch: {len(failed)} items failed ({', '.join(sorted(failed)[:5])})")
+
+
+async def run_stage(jobs):
+    """Run upload coroutines concurrently, collecting failures instead of aborting"""
+    results = await asyncio.gather(*jobs, return_exceptions=True)
+    failures = [r for r in results if isinstance(r, Exception)]
+    for failure in failures:
+        if not isinstance(failure, UploadError):
+            raise failure
+    return failures
+
+
+async def upload(args):
+    with open(args.input, 'r', encoding='utf-8') as f:
+        local = json.load(f)
+
+    async with ContentUploader(
+        args.base_url,
+        cookie=args.cookie,
+        concurrency=args.concurrency,
+        retries=args.retries,
+        checkpoint=None if args.dry_run else args.checkpoint,
+    ) as uploader:
+        remote_index = {} if args.force else hash_index(await uploader.export())
+        checkpoint = load_checkpoint(args.checkpoint, uploader.base_url)
+        courses, lessons = plan_uploads(local, remote_index, checkpoint)
+        print(f'📦 {len(courses)} courses and {len(lessons)} lessons differ from the server')
+        if args.dry_run:
+            for key, _, _ in courses + lessons:
+                print(f'  - {key}')
+            return 0
+
+        failures = []
+        # Lessons are only accepted once their course exists, so courses go first
+        for stage in (courses, lessons):
+            if args.bulk:
+                batches = [stage[i:i + args.batch_size] for i in range(0, len(stage), args.batch_size)]
+                failures += await run_stage(uploader.upload_batch(batch) for batch in batches)
+            else:
+                failures += await run_stage(uploader.upload_single(*job) for job in stage)
+        uploaded = uploader.uploaded
+
+    for failure in failures:
+        print(f'  ❌ {failure}', file=sys.stderr)
+    if failures:
+        print(f'⚠️  Uploaded with {len(failures)} failures; re-run to resume from {args.checkpoint}')
+        return 1
+    clear_checkpoint(args.checkpoint, args.base_url.rstrip('/'))
+    print(f'✅ Upload complete ({uploaded} items)')
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Upload changed courses and lessons to a deployment')
+    parser.add_argument('base_url', help='deployment root, e.g. https://example.vercel.app')
+    parser.add_argument('--input', default=str(LMS_PATH), help='lms.json to upload (default: data/lms.json)')
+    parser.add_argument('--cookie', default=os.environ.get('LMS_ADMIN_COOKIE'),
+                        help='Cookie header of a signed-in admin session (default: $LMS_ADMIN_COOKIE)')
+    parser.add_argument('-c', '--concurrency', type=int, default=8, help='parallel requests / pooled connections')
+    parser.add_argument('--retries', type=int, default=5)
+    parser.add_argument('--checkpoint', default='.content-upload.checkpoint.jsonl')
+    parser.add_argument('--bulk', action='store_true', help='send batches to /import instead of one request per item')
+    parser.add_argument('--batch-size', type=int, default=20)
+    parser.add_argument('--force', action='store_true', help='skip the server diff and upload everything not checkpointed')
+    parser.add_argument('--dry-run', action='store_true', help='only list what would be uploaded')
+    args = parser.parse_args()
+
+    try:
+        sys.exit(asyncio.run(upload(args)))
+    except UploadError as e:
+        print(f'❌ {e}', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import random
+
+from design_dedup import canonical_analysis, canonical_hash, canonicalize, display_analysis
+
+
+def relabel(chain, rng):
+    """Same chain with fresh state ids and the states and transitions shuffled"""
+    ids = [state['id'] for state in chain['states']]
+    fresh = dict(zip(ids, rng.sample([f'state-{i}' for i in range(100)], len(ids))))
+    states = [{**state, 'id': fresh[state['id']]} for state in chain['states']]
+    transitions = [{**t, 'from': fresh[t['from']], 'to': fresh[t['to']]} for t in chain['transitions']]
+    rng.shuffle(states)
+    rng.shuffle(transitions)
+    return {'states': states, 'transitions': transitions}
+
+
+def chain_from(names, edges):
+    return {
+        'states': [{'id': f's{i}', 'name': name} for i, name in enumerate(names)],
+        'transitions': [{'id': f't{k}', 'from': f's{i}', 'to': f's{j}', 'probability': p}
+                        for k, (i, j, p) in enumerate(edges)],
+    }
+
+
+# S3 was deleted and re-added, so two states are named S3 (app/tools/page.tsx names states S{n + 1})
+REPEATED_NAMES = chain_from(
+    ['S1', 'S2', 'S3', 'S3'],
+    [(0, 1, 0.5), (0, 2, 0.5), (1, 3, 1.0), (2, 2, 1.0), (3, 0, 0.3), (3, 3, 0.7)],
+)
+# Two identical two-state cycles: colour refinement alone cannot order their states
+SYMMETRIC = chain_from(
+    ['A', 'B', 'A', 'B'],
+    [(0, 1, 1.0), (1, 0, 1.0), (2, 3, 1.0), (3, 2, 1.0)],
+)
+
+
+def test_relabelled_ids_hash_and_analyze_the_same():
+    rng = random.Random(7)
+    for chain in (REPEATED_NAMES, SYMMETRIC):
+        canonical = canonicalize(chain)
+        for _ in range(20):
+            copy = canonicalize(relabel(chain, rng))
+            assert canonical_hash(copy) == canonical_hash(canonical)
+            assert canonical_analysis(copy) == canonical_analysis(canonical)
+
+
+def test_repeated_names_stay_separate_states():
+    canonical = canonicalize(REPEATED_NAMES)
+    analysis = canonical_analysis(canonical)
+    assert len(analysis['stationaryDistribution']) == 4
+    assert sorted(map(len, analysis['chainProperties']['communicatingClasses'])) == [1, 3]
+    shown = display_analysis(analysis, canonical)['chainProperties']
+    assert shown['absorbingStates'] == ['S3']
+    assert sorted(map(sorted, shown['communicatingClasses'])) == [['S1', 'S2', 'S3'], ['S3']]
+
+
+def test_different_structure_hashes_differently():
+    # S2 now feeds the absorbing S3 instead of the other one
+    changed = chain_from(['S1', 'S2', 'S3', 'S3'], [(0, 1, 0.5), (0, 2, 0.5), (1, 2, 1.0), (2, 2, 1.0), (3, 0, 0.3), (3, 3, 0.7)])
+    assert canonical_hash(canonicalize(changed)) != canonical_hash(canonicalize(REPEATED_NAMES))
@@ -0,0 +1,14 @@
+from payload_budget import iter_math
+
+
+def test_escaped_dollar_inside_inline_math():
+    text = r'A game costs $\$1$ to play. With probability 0.49, you win $\$2$ (net +$\$1$).'
+    assert list(iter_math(text)) == [(False, r'\$1'), (False, r'\$2'), (False, r'\$1')]
+
+
+def test_escaped_dollar_in_prose_is_not_math():
+    assert list(iter_math(r'a \$5 bill and $x$')) == [(False, 'x')]
+
+
+def test_display_and_inline():
+    assert list(iter_math('$$x$$ then $y$')) == [(True, 'x'), (False, 'y')]